@@ -11,35 +11,17 @@ export async function uploadCV(formData: FormData) {
     const apiFormData = new FormData()
     apiFormData.append('file', file)
 
-    // Make parallel requests to both endpoints
-    const [educationResponse, jobsResponse,profileResponse, courseraResponse] = await Promise.all([
-      fetch('http://127.0.0.1:8000/recommend-education', {
-        method: 'POST',
-        body: apiFormData,
-      }),
-      fetch('http://127.0.0.1:8000/recommend-jobs', {
-        method: 'POST',
-        body: apiFormData,
-      }),
-      fetch('http://127.0.0.1:8000/extract-profile', {
-        method: 'POST',
-        body: apiFormData,
-      }),
-      fetch('http://127.0.0.1:8000/recommend-courses', {
-        method: 'POST',
-        body: apiFormData,
-        
-      })
-    ])
+    // Single request: the backend parses the CV once and runs every pipeline concurrently
+    const response = await fetch('http://127.0.0.1:8000/analyze-cv', {
+      method: 'POST',
+      body: apiFormData,
+    })
 
-    if (!educationResponse.ok || !jobsResponse.ok || !profileResponse.ok || !courseraResponse.ok) {
+    if (!response.ok) {
       throw new Error('Failed to get recommendations')
     }
 
-    const educationData = await educationResponse.json()
-    const jobsData = await jobsResponse.json()
-    const courseraData = await courseraResponse.json()
-    const profileData = await profileResponse.json()
+    const { education: educationData, jobs: jobsData, profile: profileData, coursera: courseraData } = await response.json()
 
     return {
       success: true,
@@ -1,16 +1,43 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
+from fastapi import Request
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-import requests
-from bs4 import BeautifulSoup
+from typing import List, Optional, Dict, Any, Tuple
+from collections import OrderedDict
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import html as lxml_html
+from lxml.etree import ParserError
 from datetime import datetime
 import os
 import json
 from PyPDF2 import PdfReader
-from groq import Groq
+from PyPDF2.errors import PyPdfError
+from groq import AsyncGroq, APIConnectionError, RateLimitError, InternalServerError
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import io
 import time
+import asyncio
+import random
+import hashlib
+import sqlite3
+import threading
+import importlib.util
+import re
+import unicodedata
+import zipfile
+import tempfile
+import shutil
+import signal
+import uuid
+import itertools
+import weakref
+import numpy as np
+from contextlib import contextmanager
+from contextvars import Context, ContextVar
 
 app = FastAPI(title="Career Development API")
 
@@ -22,6 +49,1254 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class Metrics:
+    """Process-local counters, gauges and latency histograms in the Prometheus text format"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[tuple, float]] = {}
+        self.gauges: Dict[str, Dict[tuple, float]] = {}
+        self.histograms: Dict[str, Dict[tuple, List[float]]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> tuple:
+        # Label values are compared when rendering, so mixed types (status 200 vs "ConnectError") must not leak in
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges.setdefault(name, {})[self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            # Per-bucket counts, then sum and count
+            series = self.histograms.setdefault(name, {}).setdefault(key, [0] * (len(self.BUCKETS) + 2))
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @staticmethod
+    def _labels(key: tuple, extra: str = "") -> str:
+        parts = [f'{name}="{escape_label(value)}"' for name, value in key]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for kind, families in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(families.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines.extend(f"{name}{self._labels(key)} {value}" for key, value in sorted(series.items()))
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, values in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.BUCKETS, values):
+                        cumulative += count
+                        bucket = self._labels(key, f'le="{bound}"')
+                        lines.append(f"{name}_bucket{bucket} {cumulative}")
+                    bucket = self._labels(key, 'le="+Inf"')
+                    lines.append(f"{name}_bucket{bucket} {values[-1]}")
+                    lines.append(f"{name}_sum{self._labels(key)} {values[-2]}")
+                    lines.append(f"{name}_count{self._labels(key)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = Metrics()
+
+# Stage durations of the current request, reported in its Server-Timing header
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+def record_stage(stage: str, seconds: float):
+    metrics.observe("stage_duration_seconds", seconds, stage=stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0) + seconds
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{re.sub(r'[^A-Za-z0-9_-]', '_', stage)};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = {}
+    request_timings.set(timings)
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    metrics.observe(
+        "http_request_duration_seconds", elapsed,
+        method=request.method, route=route.path if route else "unmatched", status=response.status_code,
+    )
+    timings["total"] = elapsed
+    response.headers["Server-Timing"] = server_timing(timings)
+    return response
+
+# Bounded pool for CPU-bound work (PDF and HTML parsing) so it never runs on the event loop
+cpu_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CPU_POOL_SIZE", min(8, (os.cpu_count() or 1) + 2))),
+    thread_name_prefix="cpu",
+)
+
+async def run_blocking(func, *args):
+    """Run a blocking callable in the bounded CPU pool and await its result"""
+    loop = asyncio.get_running_loop()
+    with timed(f"blocking:{func.__qualname__}"):
+        return await loop.run_in_executor(cpu_executor, func, *args)
+
+# Process-wide HTTP connection pool: keep-alive connections are reused across requests
+# (per host, up to HTTP_POOL_SIZE in total) and HTTP/2 is used when `h2` is installed
+HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("HTTP_TIMEOUT", 15)), connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", 5)))
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_POOL_SIZE", 100)),
+    max_keepalive_connections=int(os.getenv("HTTP_KEEPALIVE_POOL_SIZE", 20)),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30)),
+)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_llm_clients: Dict[str, AsyncGroq] = {}
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=HTTP_LIMITS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+    return _http_client
+
+def get_llm_client(api_key: str) -> AsyncGroq:
+    client = _llm_clients.get(api_key)
+    if client is None:
+        # Completions are retried by call_upstream, which knows the request deadline
+        client = AsyncGroq(api_key=api_key, timeout=LLM_TIMEOUT, max_retries=0)
+        _llm_clients[api_key] = client
+    return client
+
+async def close_clients():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    for client in _llm_clients.values():
+        await client.close()
+    _llm_clients.clear()
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostRateLimiter:
+    """Process-wide per-host rate limits shared by every request; unlisted hosts are unlimited"""
+
+    def __init__(self, limits: Dict[str, tuple]):
+        self.buckets = {host: TokenBucket(rate, capacity) for host, (rate, capacity) in limits.items()}
+
+    async def acquire(self, url: str):
+        bucket = self.buckets.get(httpx.URL(url).host)
+        if bucket:
+            await bucket.acquire()
+
+rate_limiter = HostRateLimiter({
+    "www.coursera.org": (float(os.getenv("COURSERA_RATE", 2)), float(os.getenv("COURSERA_BURST", 4))),
+})
+
+# Upstream resilience. Each request gets REQUEST_DEADLINE seconds (each batch CV and
+# queued task gets its own), and no page fetch or completion may run past it.
+# Transient failures (connection errors, timeouts, 429 and 5xx) are retried up to
+# HTTP_MAX_RETRIES / LLM_MAX_RETRIES times with full-jitter exponential backoff. A page
+# fetch still unanswered after HEDGE_DELAY_MS gets a second, hedged request and the
+# first answer wins (LLM_HEDGE_DELAY_MS for completions; 0 disables hedging). After
+# CIRCUIT_FAILURE_THRESHOLD consecutive failures an upstream's circuit opens and calls
+# to it fail fast for CIRCUIT_RESET_TIMEOUT seconds, until a trial call succeeds.
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", 60))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 2))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY_MS", 200)) / 1000
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY_MS", 2000)) / 1000
+HEDGE_DELAY = float(os.getenv("HEDGE_DELAY_MS", 0)) / 1000
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY_MS", 0)) / 1000
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+LLM_RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+class UpstreamUnavailable(Exception):
+    """An upstream call gave up: its circuit is open or its retries ran out"""
+    status_code = 503
+
+class CircuitOpen(UpstreamUnavailable):
+    pass
+
+class DeadlineExceeded(UpstreamUnavailable):
+    status_code = 504
+
+# Monotonic time by which the current request's upstream calls must finish
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+# Fallbacks taken while serving the current request, reported in its X-Degraded header
+request_degraded: ContextVar[Optional[set]] = ContextVar("request_degraded", default=None)
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Bound the upstream calls made inside the block to `seconds` from now (None or 0: unbounded)"""
+    token = request_deadline.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    expires = request_deadline.get()
+    if expires is None:
+        return None
+    left = expires - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return left
+
+async def within_deadline(func, *args, **kwargs):
+    """Await `func(*args, **kwargs)`, giving up with DeadlineExceeded at the request deadline"""
+    timeout = remaining_time()
+    try:
+        return await asyncio.wait_for(func(*args, **kwargs), timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded") from None
+
+def mark_degraded(stage: str):
+    metrics.inc("degraded_results_total", stage=stage)
+    degraded = request_degraded.get()
+    if degraded is not None:
+        degraded.add(stage)
+
+async def track_degraded(func, *args) -> Tuple[Any, set]:
+    """Await `func(*args)` and return its result with the stages it marked degraded.
+
+    The marks still reach the enclosing request's X-Degraded header.
+    """
+    outer, degraded = request_degraded.get(), set()
+    token = request_degraded.set(degraded)
+    try:
+        return await func(*args), degraded
+    finally:
+        request_degraded.reset(token)
+        if outer is not None:
+            outer.update(degraded)
+
+async def track_degraded_iter(items, degraded: set):
+    """Iterate the async iterator `items`, adding the stages it marks degraded to `degraded`.
+
+    Tasks it starts keep reporting to the same set after the step that started them.
+    Like track_degraded, the marks still reach the enclosing request's X-Degraded header.
+    """
+    outer = request_degraded.get()
+    try:
+        while True:
+            token = request_degraded.set(degraded)
+            try:
+                item = await items.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                request_degraded.reset(token)
+            yield item
+    finally:
+        if outer is not None:
+            outer.update(degraded)
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream.
+
+    Closed, calls go through. After `failure_threshold` failures in a row it opens and
+    calls fail fast with CircuitOpen. Once `reset_timeout` has passed it is half-open:
+    a single trial call goes through, closing the circuit if it succeeds and
+    re-opening it if it fails.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self.trial):
+            raise CircuitOpen(f"{self.name} is unavailable (circuit open)")
+        self.trial = state == "half_open"
+
+    def record_success(self):
+        if self.opened_at is not None:
+            print(f"Circuit for {self.name} closed")
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                print(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """The call ended without telling us anything about the upstream (e.g. cancelled)"""
+        self.trial = False
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    breaker = circuit_breakers.get(name)
+    if breaker is None:
+        breaker = circuit_breakers[name] = CircuitBreaker(name, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+    return breaker
+
+async def hedged(name: str, attempt, delay: float):
+    """Await `attempt()`; if it hasn't finished after `delay` seconds, race a second copy"""
+    if delay <= 0:
+        return await attempt()
+    pending = {asyncio.create_task(attempt())}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            metrics.inc("upstream_hedges_total", upstream=name)
+            pending.add(asyncio.create_task(attempt()))
+        while True:
+            for task in done:
+                if task.exception() is None or not pending:
+                    return task.result()
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def call_upstream(name: str, attempt, retryable=(), retries: int = 0, hedge_delay: float = 0.0, failed=lambda result: False):
+    """Call `attempt()` through `name`'s circuit breaker, within the request deadline.
+
+    Exceptions in `retryable`, and results for which `failed(result)` is true, count
+    as upstream failures and are retried with jittered backoff. When the retries run
+    out the last failed result is returned, or UpstreamUnavailable raised.
+    """
+    breaker = circuit_breaker(name)
+    for number in range(retries + 1):
+        breaker.before_call()
+        try:
+            result = await within_deadline(hedged, name, attempt, hedge_delay)
+        except retryable as e:
+            breaker.record_failure()
+            if number == retries:
+                raise UpstreamUnavailable(f"{name} failed after {number + 1} attempts: {e}") from e
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if not failed(result):
+                breaker.record_success()
+                return result
+            breaker.record_failure()
+            if number == retries:
+                return result
+        metrics.inc("upstream_retries_total", upstream=name)
+        await asyncio.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** number)))
+
+def is_transient_response(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+@app.middleware("http")
+async def apply_request_deadline(request: Request, call_next):
+    degraded = set()
+    request_degraded.set(degraded)
+    with deadline(REQUEST_DEADLINE):
+        response = await call_next(request)
+    if degraded:
+        response.headers["X-Degraded"] = ", ".join(sorted(degraded))
+    return response
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    headers = {"Retry-After": str(max(1, round(CIRCUIT_RESET_TIMEOUT)))} if isinstance(exc, CircuitOpen) else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=headers)
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+def open_sqlite(path: str, *schema: str) -> sqlite3.Connection:
+    """Open a WAL-mode SQLite database for use from the blocking pool, creating `schema`.
+
+    Call it lazily, on first use, so each forked worker gets its own connection.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in schema:
+        conn.execute(statement)
+    return conn
+
+class SQLiteCache:
+    """Durable key/value cache in a local SQLite file, shared by every worker process.
+
+    Least-recently-used rows are evicted once the stored values exceed `max_bytes`,
+    and rows older than `ttl` seconds (if given) are treated as missing. Methods
+    block on disk I/O, so call them through `run_blocking` from async code.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = None
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = open_sqlite(
+                self.path,
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)",
+            )
+        return self.conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            now = time.time()
+            if self.ttl is not None and now - created_at > self.ttl:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str):
+        with self.lock:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Free an extra 10% so we don't evict on every insert once full
+        to_free = total - self.max_bytes * 0.9
+        stale_keys = []
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            stale_keys.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        conn.executemany("DELETE FROM cache WHERE key = ?", stale_keys)
+
+# Job summaries keyed by posting URL plus a hash of its description HTML
+summary_cache = SQLiteCache(
+    os.path.join(CACHE_DIR, "job_summaries.sqlite3"),
+    max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_MB", 64)) * 1024 * 1024,
+)
+
+class LRUCache:
+    """Bounded in-process LRU map with an optional per-entry TTL"""
+
+    def __init__(self, max_items: int, ttl: Optional[float] = None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self.entries[key] = (value, time.monotonic())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_items:
+            self.entries.popitem(last=False)
+
+class TieredCache:
+    """LRU memory tier in front of a SQLiteCache disk tier, storing JSON-serialisable values"""
+
+    def __init__(self, memory: LRUCache, disk: SQLiteCache, name: str = "tiered"):
+        self.memory = memory
+        self.disk = disk
+        self.name = name
+        self.flight = SingleFlight()
+
+    async def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            metrics.inc("cache_requests_total", cache=self.name, result="memory_hit")
+            return value
+        raw = await run_blocking(self.disk.get, key)
+        if raw is None:
+            metrics.inc("cache_requests_total", cache=self.name, result="miss")
+            return None
+        metrics.inc("cache_requests_total", cache=self.name, result="disk_hit")
+        value = json.loads(raw)
+        self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value):
+        self.memory.set(key, value)
+        await run_blocking(self.disk.set, key, json.dumps(value))
+
+    async def memoize(self, key: str, func, *args):
+        """Return the cached value for `key`, computing and storing `await func(*args)` on a miss.
+
+        Concurrent misses for the same key share one computation. A value computed
+        with a fallback (anything that called mark_degraded) is returned but not
+        stored, so the full answer is computed again once the upstream recovers.
+        """
+        value = await self.get(key)
+        if value is None:
+            value = await self.flight.run(key, self._compute, key, func, *args)
+        return value
+
+    async def _compute(self, key: str, func, *args):
+        value, degraded = await track_degraded(func, *args)
+        if not degraded:
+            await self.set(key, value)
+        return value
+
+class AsyncTTLCache:
+    """In-memory cache for an async loader with a TTL and stale-while-revalidate.
+
+    Entries younger than `ttl` are served as-is. Entries younger than `ttl + stale_ttl`
+    are served immediately while a background refresh runs. Anything older is loaded
+    before returning. Concurrent loads of the same key share one call, and results
+    rejected by `should_cache` (e.g. an empty scrape) are returned but not stored.
+    """
+
+    def __init__(self, loader, ttl: float, stale_ttl: float = 0, should_cache=bool, name: str = "ttl"):
+        self.loader = loader
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.should_cache = should_cache
+        self.entries: Dict[Any, tuple] = {}
+        self.pending: Dict[Any, asyncio.Task] = {}
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                metrics.inc("cache_requests_total", cache=self.name, result="hit")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                metrics.inc("cache_requests_total", cache=self.name, result="stale_hit")
+                self.refresh(key)
+                return value
+        metrics.inc("cache_requests_total", cache=self.name, result="miss")
+        return await asyncio.shield(self.refresh(key))
+
+    def refresh(self, key) -> asyncio.Task:
+        """Start (or join) a load of `key` in the background"""
+        task = self.pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key))
+            self.pending[key] = task
+        return task
+
+    async def _load(self, key):
+        try:
+            value = await self.loader(key)
+            if self.should_cache(value):
+                self.entries[key] = (value, time.monotonic())
+            return value
+        except Exception as e:
+            print(f"Error refreshing cache entry {key!r}: {e}")
+            entry = self.entries.get(key)
+            if entry:
+                mark_degraded(self.name)
+                return entry[0]
+            raise
+        finally:
+            self.pending.pop(key, None)
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one underlying call.
+
+    The first caller starts the call and anyone arriving while it is in flight awaits
+    the same task, getting the same result or exception. Nothing is kept once it
+    finishes, so results are never stale. Cancelling one caller doesn't cancel the
+    shared call.
+
+    A shared call serves several requests, so like a MicroBatcher batch it runs in a
+    fresh context rather than its starter's. Its deadline is the starter's, and a
+    caller with more time left that sees it fail with DeadlineExceeded starts it
+    again. The stages it marks degraded and its stage timings reach every caller.
+    """
+
+    def __init__(self):
+        self.pending: Dict[Any, tuple] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def run(self, key, func, *args, **kwargs):
+        expires = request_deadline.get()
+        while True:
+            flight = self.pending.get(key)
+            if flight is None:
+                self.calls += 1
+                flight = self.pending[key] = self._start(expires, func, *args, **kwargs)
+                flight[0].add_done_callback(lambda done: self._finish(key, done))
+            else:
+                self.shared += 1
+            task, started_expires, degraded, timings = flight
+            try:
+                return await asyncio.shield(task)
+            except DeadlineExceeded:
+                if started_expires is None or (expires is not None and expires <= started_expires):
+                    raise
+                if self.pending.get(key) is flight:
+                    del self.pending[key]
+            finally:
+                report_shared_call(degraded, timings)
+
+    @staticmethod
+    def _start(expires: Optional[float], func, *args, **kwargs) -> tuple:
+        degraded, timings = set(), {}
+
+        def start():
+            request_deadline.set(expires)
+            request_degraded.set(degraded)
+            request_timings.set(timings)
+            return asyncio.create_task(func(*args, **kwargs))
+
+        return Context().run(start), expires, degraded, timings
+
+    def _finish(self, key, task: asyncio.Task):
+        flight = self.pending.get(key)
+        if flight is not None and flight[0] is task:
+            del self.pending[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+def report_shared_call(degraded: set, timings: Dict[str, float]):
+    """Add the fallbacks and stage timings of a call run in its own context to the current request's"""
+    outer = request_degraded.get()
+    if outer is not None:
+        outer.update(degraded)
+    outer_timings = request_timings.get()
+    if outer_timings is not None:
+        for stage, seconds in timings.items():
+            outer_timings[stage] = outer_timings.get(stage, 0) + seconds
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for coalescing: lowercase host, sorted query, no fragment"""
+    parsed = httpx.URL(url)
+    return str(parsed.copy_with(fragment=None, params=sorted(parsed.params.multi_items())))
+
+# Concurrent identical page fetches, LLM prompts and job summaries share one call
+http_flight = SingleFlight()
+llm_flight = SingleFlight()
+summary_flight = SingleFlight()
+
+class MicroBatcher:
+    """Collect items submitted within `window` seconds and hand them to `handler` as one batch.
+
+    `handler` receives a list of items and must return a list of results in the same
+    order. A batch is flushed early once it holds `max_items` items or `max_chars`
+    characters, so `max_items=1` disables batching.
+
+    A batch serves several requests, so it runs in a fresh context rather than the
+    one of whoever flushed it: it has none of their request state, and its deadline
+    is the latest of its submitters' deadlines.
+    """
+
+    def __init__(self, handler, window: float, max_items: int, max_chars: int):
+        self.handler = handler
+        self.window = window
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.items: List[tuple] = []
+        self.chars = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks
+        self.tasks: set = set()
+
+    async def submit(self, item: str):
+        if self.items and self.chars + len(item) > self.max_chars:
+            self.flush()
+        future = asyncio.get_running_loop().create_future()
+        self.items.append((item, future, request_deadline.get()))
+        self.chars += len(item)
+        if len(self.items) >= self.max_items:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        # Callers that gave up (e.g. timed out) are dropped from the batch
+        batch = [(item, future, expires) for item, future, expires in self.items if not future.done()]
+        self.items, self.chars = [], 0
+        if batch:
+            expiries = [expires for _, _, expires in batch]
+            expires = None if None in expiries else max(expiries)
+            task = Context().run(asyncio.create_task, self._run(batch, expires))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, batch, expires: Optional[float]):
+        request_deadline.set(expires)
+        try:
+            results = await self.handler([item for item, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+# Scrapers parse with lxml and only build BeautifulSoup trees for the part of the page they read
+HTML_PARSER = "lxml"
+
+def parse_html(html_content: str, *strainer_args, **strainer_kwargs) -> BeautifulSoup:
+    """Parse only the elements matching the SoupStrainer arguments (and their subtrees)"""
+    return BeautifulSoup(html_content, HTML_PARSER, parse_only=SoupStrainer(*strainer_args, **strainer_kwargs))
+
+def select_containers(html_content: str, tag: str, classes: str, limit: Optional[int] = None) -> List[str]:
+    """Return the HTML of the outermost `tag` elements carrying every class in `classes`.
+
+    The page is parsed once with lxml's C parser and matched with XPath, so the
+    (much slower) BeautifulSoup tree only has to be built for the containers.
+    """
+    try:
+        root = lxml_html.fromstring(html_content)
+    except ParserError:
+        return []
+    has_classes = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes.split()
+    )
+    containers = root.xpath(f"//{tag}[{has_classes}][not(ancestor::{tag}[{has_classes}])]")
+    return [lxml_html.tostring(element, encoding="unicode") for element in containers[:limit]]
+
+def parse_containers(html_content: str, tag: str, classes: str, limit: Optional[int] = None) -> BeautifulSoup:
+    """BeautifulSoup tree holding only the first `limit` containers selected by select_containers"""
+    return BeautifulSoup("".join(select_containers(html_content, tag, classes, limit)), HTML_PARSER)
+
+def element_text(element, default=""):
+    return element.text.strip() if element else default
+
+# Token estimates use tiktoken when it is installed, otherwise ~4 characters per token
+try:
+    import tiktoken
+    _token_encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _token_encoding = None
+
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    if _token_encoding is not None:
+        return len(_token_encoding.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to roughly `max_tokens` tokens, on a word boundary where possible"""
+    if _token_encoding is not None:
+        tokens = _token_encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        text = _token_encoding.decode(tokens[:max_tokens])
+    else:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        text = text[:max_chars]
+    cut = text.rfind(" ")
+    return (text[:cut] if cut > len(text) // 2 else text).rstrip() + " ..."
+
+_DROPPED_TAGS = ("script", "style", "noscript", "svg", "iframe", "form", "button", "nav", "header", "footer")
+_BLOCK_TAGS = ("p", "div", "li", "ul", "ol", "br", "tr", "section", "article",
+               "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "blockquote")
+_BOILERPLATE_LINE = re.compile(
+    r"^(apply( now)?|easy apply|save( job)?|share( this job)?|report( this)? job|sign in|log ?in|register|"
+    r"show (more|less)|read more|back to (search|results)|similar jobs|job details|[-|•·]+)$",
+    re.IGNORECASE,
+)
+
+def html_to_text(html: str, max_tokens: Optional[int] = None) -> str:
+    """Reduce an HTML fragment to compact plain text for an LLM prompt.
+
+    Drops scripts, styles, navigation and form controls, keeps one line per block
+    element, removes boilerplate and repeated paragraphs, collapses whitespace and, if
+    `max_tokens` is given, truncates to that estimated token budget.
+    """
+    if not html or not html.strip():
+        return ""
+    try:
+        root = lxml_html.fromstring(html)
+    except ParserError:
+        return ""
+    for element in list(root.iter(*_DROPPED_TAGS)):
+        if element is not root:
+            element.drop_tree()
+    # Source line breaks are just whitespace; only block elements start a new line
+    for element in root.iter():
+        if element.text:
+            element.text = element.text.replace("\n", " ")
+        if element.tail:
+            element.tail = element.tail.replace("\n", " ")
+    for element in root.iter(*_BLOCK_TAGS):
+        # Break before the block as well as after it, so inline text right before it
+        # ("<strong>Requirements:</strong><ul>") stays on its own line
+        previous, parent = element.getprevious(), element.getparent()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + "\n"
+        elif parent is not None:
+            parent.text = (parent.text or "") + "\n"
+        element.tail = "\n" + (element.tail or "")
+        if element.tag == "li":
+            element.text = "- " + (element.text or "")
+
+    lines, seen = [], set()
+    for raw_line in root.text_content().splitlines():
+        line = " ".join(raw_line.split())
+        if not line or line in seen or _BOILERPLATE_LINE.match(line):
+            continue
+        # Short lines (labels, values) legitimately repeat; only paragraphs are deduplicated
+        if len(line) >= 40:
+            seen.add(line)
+        lines.append(line)
+    text = "\n".join(lines)
+    return truncate_to_tokens(text, max_tokens) if max_tokens else text
+
+# CV prompt preprocessing: the extracted text is cleaned and split into sections, and each
+# LLM helper is sent only the sections it needs within its own token budget
+# (CV_PROMPT_MAX_TOKENS_<HELPER> overrides a budget). CV_PREPROCESSING=0 sends the
+# whole text as extracted.
+CV_PREPROCESSING = os.getenv("CV_PREPROCESSING", "1") == "1"
+CV_PROMPT_PROFILES = {
+    helper: (sections, int(os.getenv(f"CV_PROMPT_MAX_TOKENS_{helper.upper()}", max_tokens)))
+    for helper, (sections, max_tokens) in {
+        "get_career_recommendation": (("headline", "summary", "skills", "education", "experience", "projects", "certifications"), 900),
+        "get_job_recommendation": (("headline", "summary", "experience", "skills", "education", "projects", "certifications"), 900),
+        "get_course_topic": (("headline", "skills", "experience", "summary", "education", "projects"), 700),
+        "extract_profile_info": (("headline", "contact", "summary", "skills", "experience"), 700),
+        "answer_cv_questions": (("headline", "contact", "summary", "skills", "experience", "education", "projects", "certifications", "languages"), 1400),
+    }.items()
+}
+# Section headings (English and French, accent-folded): a line that is exactly one of these
+_CV_SECTION_HEADINGS = {
+    section: re.compile(rf"^(?:{pattern})$")
+    for section, pattern in {
+        "contact": r"contacts?|coordonnees|personal (information|details|info)|informations personnelles|etat civil",
+        "summary": r"(professional )?summary|profile?|about( me)?|a propos( de moi)?|(career )?objective|objectif( professionnel)?|resume",
+        "experience": r"(professional |work )?experiences?( professionnelles?)?|work history|employment( history)?|parcours professionnel|internships?|stages?",
+        "education": r"education|academic (background|qualifications)|formations?( academiques?)?|diplomes|etudes|cursus",
+        "skills": r"(technical |key |core )?skills|competences( techniques| cles)?|expertise|tools|outils|technologies",
+        "projects": r"(academic |personal )?projects|projets( academiques| personnels)?|realisations",
+        "certifications": r"certifications?|certificates|licenses|awards|distinctions",
+        "languages": r"languages|langues",
+        "references": r"references|referees",
+        "interests": r"interests|hobbies|activities|centres? d'interets?|loisirs|activites( extra-?professionnelles)?",
+    }.items()
+}
+_CV_PAGE_ARTIFACT = re.compile(r"^(page\s*\d+(\s*(of|/|sur)\s*\d+)?|\d+\s*/\s*\d+|[-_=•·*|.]+)$", re.IGNORECASE)
+_CV_BARE_NUMBER = re.compile(r"^\d{1,3}$")
+_CV_BULLET = re.compile(r"^[•·▪►●○■□➢✓✔*–-]+\s*")
+# Header lines holding contact details rather than the candidate's headline
+_CV_CONTACT_LINE = re.compile(
+    r"@|https?://|www\.|linkedin|github|(?:\+|\b00)\d|\d(?:[\s.-]?\d){8,}"
+    r"|\b(?:tel|tél|téléphone|telephone|phone|mobile|gsm|adresse|address|e-?mail)\b",
+    re.IGNORECASE,
+)
+
+def cv_page_numbers(lines: List[str]) -> set:
+    """Indexes of the lone-number lines that count pages (1, 2, 3... or 2, 3...).
+
+    Other lone numbers (years, levels, figures) are content and are kept, as is a
+    single "1" or "2" that no later page number follows.
+    """
+    chain, expected = [], None
+    for i, line in enumerate(lines):
+        if not _CV_BARE_NUMBER.match(line):
+            continue
+        value = int(line)
+        if value == expected or (not chain and value in (1, 2)):
+            chain.append(i)
+            expected = value + 1
+    return set(chain) if len(chain) >= 2 else set()
+
+def clean_cv_text(text: str) -> str:
+    """Normalise extracted CV text to one trimmed line per line of content.
+
+    Drops page numbers ("Page 2 of 3", "2/3", or lone numbers counting the pages),
+    separators, bullets and soft hyphens, re-joins words hyphenated across line
+    breaks, and keeps one copy of page headers/footers and other repeated paragraphs.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("\u00ad", "")
+    text = re.sub(r"([a-z])-\n([a-z])", r"\1\2", text)
+    raw_lines = [" ".join(_CV_BULLET.sub("", raw_line.strip()).split()) for raw_line in text.splitlines()]
+    raw_lines = [line for line in raw_lines if line]
+    page_numbers = cv_page_numbers(raw_lines)
+    lines, seen = [], set()
+    for i, line in enumerate(raw_lines):
+        if i in page_numbers or line in seen or _CV_PAGE_ARTIFACT.match(line):
+            continue
+        if len(line) >= 40:
+            seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+def cv_section_heading(line: str) -> Optional[str]:
+    folded = unicodedata.normalize("NFKD", line.lower()).encode("ascii", "ignore").decode("ascii")
+    folded = " ".join(re.sub(r"^[^a-z]+|[^a-z]+$", "", folded).split())
+    for section, pattern in _CV_SECTION_HEADINGS.items():
+        if pattern.match(folded):
+            return section
+    return None
+
+def segment_cv(text: str) -> Dict[str, str]:
+    """Split cleaned CV text into sections by their headings.
+
+    Text before the first heading is split between "contact" (email, phone, links,
+    address) and "headline" (the name, title and any untitled summary the CV opens
+    with). A heading may share its line with content ("Skills: Python, SQL"). Returns
+    {} when no heading is recognised.
+    """
+    sections: Dict[str, List[str]] = {}
+    current, found = None, False
+    for line in text.splitlines():
+        heading, _, rest = line.partition(":")
+        section = cv_section_heading(heading) if len(heading) <= 50 else None
+        if section:
+            current, found = section, True
+            line = rest.strip()
+        if line:
+            name = current or ("contact" if _CV_CONTACT_LINE.search(line) else "headline")
+            sections.setdefault(name, []).append(line)
+    return {section: "\n".join(lines) for section, lines in sections.items()} if found else {}
+
+def cv_prompt_text(text: str, helper: str) -> str:
+    """The part of the CV that `helper`'s prompt needs, within its token budget.
+
+    The budget is shared out so that short sections are kept whole and long ones are
+    truncated to an equal share of what is left. CVs without recognisable headings
+    are sent cleaned and truncated.
+    """
+    if not CV_PREPROCESSING:
+        return text
+    wanted, max_tokens = CV_PROMPT_PROFILES[helper]
+    cleaned = clean_cv_text(text)
+    sections = segment_cv(cleaned)
+    names = [name for name in wanted if name in sections]
+    if not names:
+        return truncate_to_tokens(cleaned, max_tokens)
+    sizes = {name: estimate_tokens(sections[name]) for name in names}
+    allowance, remaining = {}, max_tokens
+    for i, name in enumerate(sorted(names, key=sizes.get)):
+        allowance[name] = min(sizes[name], remaining // (len(names) - i))
+        remaining -= allowance[name]
+    return "\n\n".join(
+        f"{name.capitalize()}:\n{truncate_to_tokens(sections[name], allowance[name])}"
+        for name in names if allowance[name] > 0
+    )
+
+# Local theme matching: TF-IDF vectors over the theme descriptions (and any scraped
+# program descriptions), scored against the CV by cosine similarity
+_WORD = re.compile(r"[a-z0-9+#]{2,}")
+_STOPWORDS = frozenset("""
+    a an and are as at be by de des du en et for from in is la le les of on or ou par
+    pour sur the to un une with dans au aux avec est sont this that ce ces qui que
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-folded word tokens (so "Énergie" and "energie" match)"""
+    folded = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    return [word for word in _WORD.findall(folded) if word not in _STOPWORDS]
+
+class ThemeMatcher:
+    """Ranks a fixed set of labels by TF-IDF cosine similarity to a text.
+
+    Each label's document is its description plus any extra text added with
+    add_documents (e.g. scraped program descriptions); the matrix is rebuilt on
+    change, which takes well under a millisecond for a dozen labels.
+    """
+
+    def __init__(self, descriptions: Dict[str, str]):
+        self.labels = list(descriptions)
+        self.documents = {label: [description] for label, description in descriptions.items()}
+        self.lock = threading.Lock()
+        self._fit()
+
+    def add_documents(self, label: str, texts: List[str]):
+        with self.lock:
+            self.documents[label] = self.documents[label][:1] + [text for text in texts if text]
+            self._fit()
+
+    def _fit(self):
+        counts = [{} for _ in self.labels]
+        for row, label in enumerate(self.labels):
+            for word in tokenize(" ".join(self.documents[label])):
+                counts[row][word] = counts[row].get(word, 0) + 1
+        vocabulary = {word: column for column, word in enumerate(sorted({word for c in counts for word in c}))}
+        tf = np.zeros((len(self.labels), len(vocabulary)), dtype=np.float32)
+        for row, c in enumerate(counts):
+            for word, count in c.items():
+                tf[row, vocabulary[word]] = 1 + np.log(count)
+        idf = np.log((1 + len(self.labels)) / (1 + (tf > 0).sum(axis=0))) + 1
+        matrix = tf * idf
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        self.vocabulary, self.idf, self.matrix = vocabulary, idf, matrix
+
+    def scores(self, text: str) -> np.ndarray:
+        vocabulary, idf, matrix = self.vocabulary, self.idf, self.matrix
+        columns = [vocabulary[word] for word in tokenize(text) if word in vocabulary]
+        if not columns:
+            return np.zeros(len(self.labels), dtype=np.float32)
+        counts = np.bincount(columns, minlength=len(vocabulary))
+        present = counts > 0
+        vector = np.zeros(len(vocabulary), dtype=np.float32)
+        vector[present] = (1 + np.log(counts[present])) * idf[present]
+        vector /= np.linalg.norm(vector) + 1e-12
+        return matrix @ vector
+
+    def top_k(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
+        scores = self.scores(text)
+        order = np.argsort(-scores)[:k]
+        return [(self.labels[i], round(float(scores[i]), 4)) for i in order]
+
+_PHRASE_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9][a-z0-9+#]*)*")
+
+def phrase_tokens(text: str) -> List[str]:
+    """Lowercase, accent-folded tokens that keep "c++", "node.js" and "ci/cd" whole"""
+    folded = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    return _PHRASE_TOKEN.findall(folded)
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over word tokens: finds every dictionary phrase in one pass.
+
+    `phrases` maps each phrase (any casing or accents) to the label reported for it;
+    find() yields (start, length, label) for every occurrence, overlapping ones included.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.outputs: List[List[Tuple[str, int]]] = [[]]
+        for phrase, label in phrases.items():
+            words = phrase_tokens(phrase)
+            state = 0
+            for word in words:
+                if word not in self.goto[state]:
+                    self.goto[state][word] = len(self.goto)
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = self.goto[state][word]
+            if words:
+                self.outputs[state].append((label, len(words)))
+        # Failure links, breadth first so every shorter suffix state is done first
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for word, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def find(self, words: List[str]):
+        state = 0
+        for position, word in enumerate(words):
+            while state and word not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(word, 0)
+            for label, length in self.outputs[state]:
+                yield position - length + 1, length, label
+
+    def find_longest(self, words: List[str]) -> List[Tuple[int, str]]:
+        """(start, label) of each match not inside a longer one ("Lean Six Sigma", not "Six Sigma")"""
+        matches, end = [], 0
+        for start, length, label in sorted(self.find(words), key=lambda m: (m[0], -m[1])):
+            if start >= end:
+                matches.append((start, label))
+                end = start + length
+        return matches
+
+class ProfileExtractor:
+    """Rule-based CV profile extraction, in milliseconds and without an LLM.
+
+    Email and phone come from regexes, the location from a gazetteer of cities (with
+    their country) matched in the CV's header, the name from the header's first line
+    that looks like one, and the key skills from a skills dictionary, ranked by how
+    often they are mentioned (mentions in the skills section count triple). Fields it
+    can't determine are left as None.
+    """
+
+    EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+    MOROCCAN_PHONE = re.compile(r"(?:(?:\+|00)\s?212\s?(?:\(0\))?\s?|\b0)([5-7](?:[\s.-]?\d){8})\b")
+    INTERNATIONAL_PHONE = re.compile(r"(?:\+|\b00)(\d{1,3})[\s.-]?(\(?\d{1,4}\)?(?:[\s.-]?\d{2,4}){2,4})\b")
+    NAME_LABEL = re.compile(r"^(?:full name|name|nom(?: complet| et prenom)?|prenom et nom)\s*:\s*(.+)$", re.IGNORECASE)
+    NAME_WORD = re.compile(r"^[A-ZÀ-Ý][A-Za-zÀ-ÿ'’-]*\.?$")
+    # Words that make a header line a title or job rather than a name
+    NOT_NAME_WORDS = frozenset(phrase_tokens(
+        "curriculum vitae cv resume engineer ingenieur developer developpeur manager data analyst student etudiant "
+        "technician technicien consultant intern stagiaire master licence doctorant phd profile profil address adresse "
+        "email phone telephone tel mobile linkedin github"
+    ))
+    HEADER_LINES = 15
+
+    def __init__(self, skills: List[str], skill_aliases: Dict[str, str], cities: Dict[str, Tuple[str, List[str]]]):
+        self.skills = PhraseMatcher({**{skill: skill for skill in skills}, **skill_aliases})
+        self.countries = {city: country for city, (country, _) in cities.items()}
+        self.cities = PhraseMatcher({
+            **{city: city for city in cities},
+            **{alias: city for city, (_, aliases) in cities.items() for alias in aliases},
+        })
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        cleaned = clean_cv_text(text)
+        sections = segment_cv(cleaned)
+        header = "\n".join(sections[name] for name in ("headline", "contact") if name in sections)
+        header = header or "\n".join(cleaned.splitlines()[:self.HEADER_LINES])
+        return {
+            "full_name": self.full_name(header),
+            "location": self.location(header),
+            "email": self.email(cleaned),
+            "phone": self.phone(cleaned),
+            "key_skills": self.key_skills(cleaned, sections.get("skills", ""), PROFILE_MAX_SKILLS),
+        }
+
+    def email(self, text: str) -> Optional[str]:
+        match = self.EMAIL.search(text)
+        return match.group(0).lower() if match else None
+
+    def phone(self, text: str) -> Optional[str]:
+        """First phone number in E.164 form (national Moroccan numbers get +212)"""
+        match = self.MOROCCAN_PHONE.search(text)
+        if match:
+            return "+212" + re.sub(r"\D", "", match.group(1))
+        match = self.INTERNATIONAL_PHONE.search(text)
+        if match:
+            return f"+{match.group(1)}{re.sub(r'[^0-9]', '', match.group(2))}"
+        return None
+
+    def location(self, header: str) -> Optional[str]:
+        matches = self.cities.find_longest(phrase_tokens(header))
+        if not matches:
+            return None
+        city = matches[0][1]
+        return f"{city}, {self.countries[city]}"
+
+    def full_name(self, header: str) -> Optional[str]:
+        for line in header.splitlines():
+            labelled = self.NAME_LABEL.match(line)
+            if labelled:
+                return " ".join(labelled.group(1).split()[:4])
+        for line in header.splitlines()[:5]:
+            words = line.split()
+            if not 2 <= len(words) <= 4 or not all(self.NAME_WORD.match(word) for word in words):
+                continue
+            if self.NOT_NAME_WORDS.intersection(phrase_tokens(line)) or self.cities.find_longest(phrase_tokens(line)):
+                continue
+            return " ".join(word if not word.isupper() else word.capitalize() for word in words)
+        return None
+
+    def key_skills(self, text: str, skills_section: str, limit: int = 4) -> List[str]:
+        scores: Dict[str, List[int]] = {}
+        for start, skill in self.skills.find_longest(phrase_tokens(text)):
+            scores.setdefault(skill, [0, start])[0] += 1
+        for _, skill in self.skills.find_longest(phrase_tokens(skills_section)):
+            if skill in scores:
+                scores[skill][0] += 2
+        # Most mentioned first, then in order of appearance
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], item[1][1]))
+        return [skill for skill, _ in ranked[:limit]]
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """Parse the outermost {...} object of an LLM reply, ignoring any surrounding text"""
+    start_idx = text.find('{')
+    end_idx = text.rfind('}') + 1
+    if start_idx == -1 or end_idx == 0:
+        raise ValueError("No JSON object found in response")
+    parsed = json.loads(text[start_idx:end_idx])
+    if not isinstance(parsed, dict):
+        raise ValueError("Response is not a JSON object")
+    return parsed
+
 class UM6PCareerAdvisor:
     SPECIFIC_THEMES = [
         "Agriculture",
@@ -51,12 +1326,133 @@ class UM6PCareerAdvisor:
         "Sciences des Eaux": "https://exed.um6p.ma/program-finder?f=&startdate=&enddate=&topic%5B%5D=19",
         "Sustainability": "https://exed.um6p.ma/fr/program-finder/?f=&startdate=&enddate=&topic%5B%5D=69",
     }
+    # Seed vocabulary (English and French) for the local theme matcher; scraped program
+    # descriptions are added to these as each theme's catalogue is loaded
+    THEME_DESCRIPTIONS = {
+        "Agriculture": "agriculture agronomy agronomie farming crops cultures soil sol irrigation fertilizer engrais phosphate plant nutrition agritech food security sécurité alimentaire livestock élevage harvest récolte rural",
+        "Digital: AI, Data Science, Cybersecurity & Cloud Computing": "artificial intelligence intelligence artificielle machine learning deep learning data science données python sql software developer développeur programming cloud aws azure devops cybersecurity cybersécurité security network réseaux big data analytics nlp computer vision",
+        "Energie Renouvelable": "renewable energy énergie renouvelable solar solaire photovoltaic photovoltaïque wind éolien hydrogen hydrogène battery batteries storage stockage grid réseau électrique power electrical électrique energy efficiency",
+        "Géologie et Exploitation Minière": "geology géologie mining mines minière exploitation ore minerai mineral exploration drilling forage geophysics géophysique geotechnical géotechnique quarry carrière phosphate deposit gisement",
+        "HSE, Wellbeing & Sciences de la Santé": "health santé safety sécurité environment hse occupational risk risque wellbeing bien-être medical médical nursing hospital hôpital public health epidemiology pharmacy pharmacie clinical clinique prevention ergonomics",
+        "Industrie 4.0": "industry 4.0 industrie automation automatisation robotics robotique iot internet of things manufacturing production maintenance lean supply chain logistics logistique plc scada digital twin mechatronics mécatronique quality qualité",
+        "Innovation Urbaine et Territoriale": "urban urbain urbanism urbanisme city ville smart city territorial territoire planning aménagement architecture mobility mobilité transport housing logement infrastructure gis regional development",
+        "Process Engineering": "process engineering génie des procédés chemical chimique chemistry chimie reactor réacteur distillation unit operations plant usine simulation aspen optimization process control fertilizer production",
+        "Science des Matériaux et Nanotechnologie": "materials science matériaux nanotechnology nanotechnologie nanomaterials polymers polymères composites metallurgy métallurgie ceramics céramiques characterization caractérisation thin films semiconductors microscopy",
+        "Sciences de l'éducation": "education éducation teaching enseignement teacher enseignant pedagogy pédagogie training formation learning apprentissage curriculum e-learning instructional design school école university coaching",
+        "Sciences des Eaux": "water eau hydrology hydrologie hydrogeology hydrogéologie wastewater eaux usées treatment traitement desalination dessalement irrigation water resources ressources en eau sanitation assainissement drinking water",
+        "Sustainability": "sustainability durabilité sustainable development développement durable climate climat carbon carbone esg circular economy économie circulaire environmental impact csr rse green transition biodiversity",
+    }
+
+    # Dictionary for the local profile extractor: canonical skill names, plus French and
+    # abbreviated spellings reported under the canonical name
+    PROFILE_SKILLS = [
+        "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "SQL", "NoSQL", "MongoDB", "PostgreSQL", "MySQL",
+        "Spark", "Hadoop", "Kafka", "Airflow", "Databricks", "Snowflake", "Power BI", "Tableau", "Excel", "VBA",
+        "Pandas", "NumPy", "Scikit-learn", "TensorFlow", "PyTorch", "Keras", "Machine Learning", "Deep Learning",
+        "Artificial Intelligence", "NLP", "Computer Vision", "Data Analysis", "Data Science", "Data Engineering",
+        "Big Data", "ETL", "Statistics", "MATLAB", "Simulink", "Docker", "Kubernetes", "AWS", "Azure", "Google Cloud",
+        "Linux", "Git", "CI/CD", "DevOps", "Terraform", "React", "Angular", "Vue.js", "Node.js", "Django", "Flask",
+        "Spring Boot", "PHP", "Laravel", "HTML", "CSS", "REST APIs", "Cybersecurity", "Network Security",
+        "Penetration Testing", "SIEM", "Cisco", "Networking", "IoT", "Embedded Systems", "Arduino", "Raspberry Pi",
+        "PLC", "SCADA", "Robotics", "TIA Portal", "LabVIEW", "Industry 4.0", "Lean Manufacturing", "Six Sigma",
+        "Lean Six Sigma", "Kaizen", "TPM", "Predictive Maintenance", "Quality Management", "ISO 9001", "ISO 14001",
+        "ISO 45001", "HSE", "Risk Assessment", "HAZOP", "Supply Chain", "Logistics", "SAP", "ERP",
+        "Project Management", "Agile", "Scrum", "PMP", "MS Project", "AutoCAD", "SolidWorks", "CATIA", "Revit",
+        "ANSYS", "COMSOL", "Aspen Plus", "Aspen HYSYS", "Process Simulation", "Process Control", "Process Engineering",
+        "Chemical Engineering", "Heat Transfer", "Unit Operations", "Fertilizers", "Hydrology", "Hydrogeology",
+        "Water Treatment", "Wastewater Treatment", "Desalination", "Irrigation", "GIS", "ArcGIS", "QGIS",
+        "Remote Sensing", "Geology", "Geophysics", "Mining Engineering", "Drilling", "Renewable Energy",
+        "Solar Energy", "Photovoltaics", "Wind Energy", "Energy Efficiency", "Green Hydrogen", "Battery Storage",
+        "Power Systems", "Electrical Engineering", "Agronomy", "Soil Science", "Precision Agriculture",
+        "Materials Science", "Nanotechnology", "Polymers", "Composites", "Metallurgy", "Life Cycle Assessment",
+        "Carbon Accounting", "ESG", "Circular Economy", "Environmental Impact Assessment", "Urban Planning",
+        "Smart Cities", "Curriculum Design", "E-learning", "Instructional Design",
+    ]
+    PROFILE_SKILL_ALIASES = {
+        "apprentissage automatique": "Machine Learning", "apprentissage profond": "Deep Learning",
+        "intelligence artificielle": "Artificial Intelligence", "analyse de donnees": "Data Analysis",
+        "science des donnees": "Data Science", "traitement du langage naturel": "NLP",
+        "vision par ordinateur": "Computer Vision", "powerbi": "Power BI", "sklearn": "Scikit-learn",
+        "k8s": "Kubernetes", "gcp": "Google Cloud", "google cloud platform": "Google Cloud",
+        "amazon web services": "AWS", "microsoft azure": "Azure", "nodejs": "Node.js", "vuejs": "Vue.js",
+        "reactjs": "React", "springboot": "Spring Boot", "rest api": "REST APIs", "cyber security": "Cybersecurity",
+        "cybersecurite": "Cybersecurity", "securite informatique": "Cybersecurity", "reseaux": "Networking",
+        "systemes embarques": "Embedded Systems", "automates programmables": "PLC", "automate programmable": "PLC",
+        "robotique": "Robotics", "industrie 4.0": "Industry 4.0", "lean": "Lean Manufacturing",
+        "maintenance predictive": "Predictive Maintenance", "gestion de la qualite": "Quality Management",
+        "management de la qualite": "Quality Management", "qhse": "HSE", "analyse des risques": "Risk Assessment",
+        "chaine logistique": "Supply Chain", "supply chain management": "Supply Chain",
+        "gestion de projet": "Project Management", "gestion de projets": "Project Management",
+        "methodes agiles": "Agile", "microsoft project": "MS Project", "hysys": "Aspen HYSYS",
+        "simulation des procedes": "Process Simulation", "genie des procedes": "Process Engineering",
+        "genie chimique": "Chemical Engineering", "transfert de chaleur": "Heat Transfer",
+        "operations unitaires": "Unit Operations", "engrais": "Fertilizers", "hydrologie": "Hydrology",
+        "hydrogeologie": "Hydrogeology", "traitement des eaux": "Water Treatment",
+        "traitement des eaux usees": "Wastewater Treatment", "dessalement": "Desalination",
+        "teledetection": "Remote Sensing", "sig": "GIS", "geologie": "Geology", "geophysique": "Geophysics",
+        "forage": "Drilling", "energies renouvelables": "Renewable Energy", "energie renouvelable": "Renewable Energy",
+        "energie solaire": "Solar Energy", "photovoltaique": "Photovoltaics", "photovoltaic": "Photovoltaics",
+        "energie eolienne": "Wind Energy", "efficacite energetique": "Energy Efficiency",
+        "hydrogene vert": "Green Hydrogen", "genie electrique": "Electrical Engineering", "agronomie": "Agronomy",
+        "science des sols": "Soil Science", "agriculture de precision": "Precision Agriculture",
+        "science des materiaux": "Materials Science", "nanotechnologies": "Nanotechnology", "polymeres": "Polymers",
+        "metallurgie": "Metallurgy", "analyse du cycle de vie": "Life Cycle Assessment", "acv": "Life Cycle Assessment",
+        "bilan carbone": "Carbon Accounting", "economie circulaire": "Circular Economy",
+        "etude d'impact environnemental": "Environmental Impact Assessment", "urbanisme": "Urban Planning",
+        "villes intelligentes": "Smart Cities", "smart city": "Smart Cities", "ingenierie pedagogique": "Instructional Design",
+    }
+    # Gazetteer for the profile location: city -> (country, other spellings)
+    PROFILE_CITIES = {
+        "Casablanca": ("Morocco", ["casa", "dar el beida"]), "Rabat": ("Morocco", []),
+        "Fès": ("Morocco", ["fez"]), "Marrakech": ("Morocco", ["marrakesh"]), "Tangier": ("Morocco", ["tanger"]),
+        "Agadir": ("Morocco", []), "Meknès": ("Morocco", []), "Oujda": ("Morocco", []), "Kénitra": ("Morocco", []),
+        "Tétouan": ("Morocco", []), "Salé": ("Morocco", []), "Témara": ("Morocco", []),
+        "Mohammedia": ("Morocco", []), "El Jadida": ("Morocco", []), "Safi": ("Morocco", []),
+        "Khouribga": ("Morocco", []), "Ben Guerir": ("Morocco", ["benguerir"]), "Beni Mellal": ("Morocco", []),
+        "Nador": ("Morocco", []), "Settat": ("Morocco", []), "Berrechid": ("Morocco", []),
+        "Laâyoune": ("Morocco", []), "Dakhla": ("Morocco", []), "Errachidia": ("Morocco", []),
+        "Ouarzazate": ("Morocco", []), "Essaouira": ("Morocco", []), "Khemisset": ("Morocco", []),
+        "Taza": ("Morocco", []), "Larache": ("Morocco", []), "Ksar El Kebir": ("Morocco", []),
+        "Guelmim": ("Morocco", []), "Al Hoceima": ("Morocco", []), "Ifrane": ("Morocco", []),
+        "Youssoufia": ("Morocco", []), "Tiznit": ("Morocco", []), "Taroudant": ("Morocco", []),
+        "Paris": ("France", []), "Lyon": ("France", []), "Marseille": ("France", []), "Toulouse": ("France", []),
+        "Lille": ("France", []), "Montpellier": ("France", []), "Madrid": ("Spain", []), "Barcelona": ("Spain", ["barcelone"]),
+        "Brussels": ("Belgium", ["bruxelles"]), "Montréal": ("Canada", []), "Québec": ("Canada", []),
+        "Toronto": ("Canada", []), "London": ("United Kingdom", ["londres"]), "Berlin": ("Germany", []),
+        "Dubai": ("United Arab Emirates", []), "Doha": ("Qatar", []), "Dakar": ("Senegal", []),
+        "Abidjan": ("Côte d'Ivoire", []), "Tunis": ("Tunisia", []), "Algiers": ("Algeria", ["alger"]),
+    }
 
     api_keys = {
     }
+
+    # Job-detail enrichment: how many Bayt listings to return, how many to fetch and
+    # summarise at once, and how long (seconds) each listing may take before it is
+    # returned without a description
+    JOB_LISTING_LIMIT = int(os.getenv("JOB_LISTING_LIMIT", 4))
+    JOB_DETAIL_CONCURRENCY = int(os.getenv("JOB_DETAIL_CONCURRENCY", 4))
+    JOB_DETAIL_TIMEOUT = float(os.getenv("JOB_DETAIL_TIMEOUT", 20))
+    DESCRIPTION_UNAVAILABLE = "Description unavailable"
+    # PDF extraction budgets: uploads larger than PDF_MAX_UPLOAD_MB are rejected, and only
+    # the first PDF_MAX_PAGES pages / PDF_MAX_CHARS characters are read, within
+    # PDF_TIME_BUDGET seconds of CPU time per document
+    PDF_MAX_UPLOAD_BYTES = int(float(os.getenv("PDF_MAX_UPLOAD_MB", 10)) * 1024 * 1024)
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 20))
+    PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", 50000))
+    PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", 10))
+    # Job postings are reduced to plain text of at most this many tokens before summarising
+    JOB_TEXT_MAX_TOKENS = int(os.getenv("JOB_TEXT_MAX_TOKENS", 600))
+    SUMMARY_FAILED = "Unable to generate a summary."
+    PROFILE_NOT_FOUND = {
+        "full_name": "Unknown",
+        "location": "Not specified",
+        "email": "Not specified",
+        "phone": "Not specified",
+        "key_skills": ["Not specified"]
+    }
     system_prompt = {
         "role": "system",
-        "content": "Analyze the following HTML code and extract a 5-line job description in one paragraph, focusing on the most important details of the job. Provide the description in a concise paragraph directly without any introductory sentence or additional text."
+        "content": "Analyze the following job posting and extract a 5-line job description in one paragraph, focusing on the most important details of the job. Provide the description in a concise paragraph directly without any introductory sentence or additional text."
     }
 
     headers = {
@@ -68,9 +1464,73 @@ class UM6PCareerAdvisor:
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1'
     }
+
+    @staticmethod
+    async def fetch(url, headers=None):
+        """GET a page without blocking the event loop, honouring the per-host rate limits.
+
+        Concurrent fetches of the same URL share one request and response. Raises
+        UpstreamUnavailable when the host's circuit is open or its retries run out.
+        """
+        key = (normalize_url(url), tuple(sorted((headers or {}).items())))
+        return await within_deadline(http_flight.run, key, UM6PCareerAdvisor.fetch_once, url, headers)
+
+    @staticmethod
+    async def fetch_once(url, headers=None):
+        host = httpx.URL(url).host
+
+        async def attempt():
+            await rate_limiter.acquire(url)
+            with timed(f"fetch:{host}"):
+                try:
+                    response = await get_http_client().get(url, headers=headers)
+                except httpx.HTTPError as e:
+                    metrics.inc("upstream_responses_total", host=host, status=type(e).__name__)
+                    raise
+            metrics.inc("upstream_responses_total", host=host, status=response.status_code)
+            return response
+
+        return await call_upstream(
+            host, attempt, retryable=(httpx.TransportError,), retries=HTTP_MAX_RETRIES,
+            hedge_delay=HEDGE_DELAY, failed=is_transient_response,
+        )
+
+    @staticmethod
+    def llm_client(name):
+        """Long-lived Groq client for the API key configured under `name`"""
+        return get_llm_client(UM6PCareerAdvisor.api_keys[name])
+
+    @staticmethod
+    async def complete(client, helper, **request):
+        """Create a chat completion for `helper`; concurrent identical requests share one call"""
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+        with timed(f"llm:{helper}"):
+            return await within_deadline(llm_flight.run, key, UM6PCareerAdvisor.create_completion, client, helper, **request)
+
     @staticmethod
-    def get_job_recommendation(text):
-        client = Groq(api_key=UM6PCareerAdvisor.api_keys["get_job_recommendation"])
+    async def create_completion(client, helper, **request):
+        async def attempt():
+            try:
+                response = await client.chat.completions.create(**request)
+            except Exception as e:
+                metrics.inc("upstream_responses_total", host="groq", status=type(e).__name__)
+                raise
+            metrics.inc("upstream_responses_total", host="groq", status=200)
+            return response
+
+        response = await call_upstream(
+            "groq", attempt, retryable=LLM_RETRYABLE_ERRORS, retries=LLM_MAX_RETRIES, hedge_delay=LLM_HEDGE_DELAY,
+        )
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, helper=helper, kind="prompt")
+            metrics.inc("llm_tokens_total", usage.completion_tokens or 0, helper=helper, kind="completion")
+        return response
+
+    @staticmethod
+    async def get_job_recommendation(text):
+        client = UM6PCareerAdvisor.llm_client("get_job_recommendation")
+        text = cv_prompt_text(text, "get_job_recommendation")
         prompt = f"""Based on the following CV text, recommend ONE specific job title that best matches the candidate's profile:
         Consider:
         - Current skills and experience
@@ -86,42 +1546,47 @@ class UM6PCareerAdvisor:
         Return only the job title without any additional explanation."""
         
         try:
-            response = client.chat.completions.create(
+            response = await UM6PCareerAdvisor.complete(client, "get_job_recommendation",
                 model="llama3-70b-8192",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=50,
                 temperature=0.7
             )
             return response.choices[0].message.content.strip()
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"API Error: {str(e)}")
 
     @staticmethod
-    def extract_div_content(job_url):
+    def parse_job_detail(html_content):
+        div_content = select_containers(html_content, 'div', 't-break', limit=1)
+        if div_content:
+            return html_to_text(div_content[0], UM6PCareerAdvisor.JOB_TEXT_MAX_TOKENS) or None
+        else:
+            return None
+
+    @staticmethod
+    async def extract_div_content(job_url):
         try:
-            response = requests.get(job_url, headers=UM6PCareerAdvisor.headers)
+            response = await UM6PCareerAdvisor.fetch(job_url, headers=UM6PCareerAdvisor.headers)
             if response.status_code == 200:
-                html_content = response.text
-                soup = BeautifulSoup(html_content, 'html.parser')
-                div_content = soup.find('div', class_='t-break')
-                if div_content:
-                    return str(div_content)
-                else:
-                    return None
+                return await run_blocking(UM6PCareerAdvisor.parse_job_detail, response.text)
             else:
                 return None
-        except requests.RequestException as e:
+        except (httpx.HTTPError, UpstreamUnavailable) as e:
             print(f"Error occurred while fetching job detail page: {e}")
+            mark_degraded("job_details")
             return None
 
     @staticmethod
-    def summarize_job_description(job_html):
-        client = Groq(api_key=UM6PCareerAdvisor.api_keys["summarize_job_description"])
+    async def summarize_job_description(job_html):
+        client = UM6PCareerAdvisor.llm_client("summarize_job_description")
         chat_history = [UM6PCareerAdvisor.system_prompt]
         chat_history.append({"role": "user", "content": job_html})
        
         try:
-            response = client.chat.completions.create(
+            response = await UM6PCareerAdvisor.complete(client, "summarize_job_description",
                 model="llama3-70b-8192",
                 messages=chat_history,
                 max_tokens=100,
@@ -131,31 +1596,70 @@ class UM6PCareerAdvisor:
             return assistant_reply.strip().split('\n', 1)[-1].strip()
         except Exception as e:
             print("An error occurred with Llama:", str(e))
-            return "Unable to generate a summary."
+            return UM6PCareerAdvisor.SUMMARY_FAILED
 
     @staticmethod
-    def extract_job_details(html_content):
-        soup = BeautifulSoup(html_content, 'html.parser')
-        job_listings = soup.find_all('li', class_='has-pointer-d')
+    async def summarize_job_batch(job_htmls):
+        """Summarise several job postings with a single structured-JSON completion.
+
+        Postings the model skips, or whose summary can't be parsed, fall back to
+        individual summarize_job_description calls.
+        """
+        if len(job_htmls) == 1:
+            return [await UM6PCareerAdvisor.summarize_job_description(job_htmls[0])]
+
+        client = UM6PCareerAdvisor.llm_client("summarize_job_description")
+        postings = "\n\n".join(f"Posting {i}:\n{job_html}" for i, job_html in enumerate(job_htmls))
+        prompt = f"""For each job posting below, extract a 5-line job description in one paragraph, focusing on the most important details of the job. Write each description directly, without any introductory sentence.
+
+        Return only a JSON object of this form, with one entry per posting:
+        {{"summaries": [{{"id": 0, "summary": "..."}}]}}
+
+        {postings}"""
+
+        summaries: Dict[int, str] = {}
+        try:
+            response = await UM6PCareerAdvisor.complete(client, "summarize_job_batch",
+                model="llama3-70b-8192",
+                messages=[
+                    {"role": "system", "content": "You summarise job postings and only return valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=150 * len(job_htmls),
+                temperature=0.9
+            )
+            parsed = extract_json_object(response.choices[0].message.content)
+            for entry in parsed.get("summaries", []):
+                try:
+                    summary = str(entry["summary"]).strip()
+                    if summary:
+                        summaries[int(entry["id"])] = summary
+                except (KeyError, TypeError, ValueError):
+                    continue
+        except Exception as e:
+            print("An error occurred with the batched Llama summary:", str(e))
+
+        missing = [i for i in range(len(job_htmls)) if i not in summaries]
+        fallbacks = await asyncio.gather(*(UM6PCareerAdvisor.summarize_job_description(job_htmls[i]) for i in missing))
+        summaries.update(zip(missing, fallbacks))
+        return [summaries[i] for i in range(len(job_htmls))]
+
+    @staticmethod
+    def parse_job_listings(html_content, limit=4):
+        """Parse the Bayt search results page into job dicts without descriptions"""
+        soup = parse_containers(html_content, 'li', 'has-pointer-d', limit)
+        job_listings = soup.find_all('li', class_='has-pointer-d', limit=limit)
         jobs = []
 
-        for i, job in enumerate(job_listings[:4]):
+        for i, job in enumerate(job_listings):
             title_elem = job.find('a', {'data-js-aid': 'jobID'})
-            title = title_elem.text.strip() if title_elem else 'N/A'
+            title = element_text(title_elem, 'N/A')
             job_url = title_elem.get('href') if title_elem else 'N/A'
             job_url_full = f"https://www.bayt.com{job_url}" if job_url != 'N/A' else 'N/A'
             
-            company_elem = job.find('span', class_='t-default t-small')
-            company = company_elem.text.strip() if company_elem else 'N/A'
-            
-            location_elem = job.find('div', class_='t-mute t-small')
-            location = location_elem.text.strip() if location_elem else 'N/A'
-            
-            job_html = UM6PCareerAdvisor.extract_div_content(job_url_full) if job_url_full != 'N/A' else 'N/A'
-            description = UM6PCareerAdvisor.summarize_job_description(job_html) if job_html else 'N/A'
-            
-            date_elem = job.find('span', {'data-automation-id': 'job-active-date'})
-            posting_date = date_elem.text.strip() if date_elem else 'N/A'
+            company = element_text(job.find('span', class_='t-default t-small'), 'N/A')
+            location = element_text(job.find('div', class_='t-mute t-small'), 'N/A')
+            posting_date = element_text(job.find('span', {'data-automation-id': 'job-active-date'}), 'N/A')
             
             remote_elem = job.find('dl', class_='dlist')
             remote_status = 'Remote' if remote_elem and 'Remote' in remote_elem.text else 'Not specified'
@@ -164,7 +1668,7 @@ class UM6PCareerAdvisor:
                 'title': title,
                 'company': company,
                 'location': location,
-                'description': description,
+                'description': 'N/A',
                 'posting_date': posting_date,
                 'remote_status': remote_status,
                 'job_url': job_url_full
@@ -172,6 +1676,64 @@ class UM6PCareerAdvisor:
             jobs.append(job_info)
         return jobs
 
+    @staticmethod
+    async def describe_job(job_url_full):
+        """Fetch a job detail page and summarise it, reusing cached summaries of unchanged postings"""
+        job_html = await UM6PCareerAdvisor.extract_div_content(job_url_full) if job_url_full != 'N/A' else 'N/A'
+        if not job_html or job_html == 'N/A':
+            return 'N/A'
+
+        cache_key = f"{job_url_full}#{hashlib.sha256(job_html.encode('utf-8')).hexdigest()}"
+        return await summary_flight.run(cache_key, UM6PCareerAdvisor.cached_summary, cache_key, job_html)
+
+    @staticmethod
+    async def cached_summary(cache_key, job_html):
+        summary = await run_blocking(summary_cache.get, cache_key)
+        metrics.inc("cache_requests_total", cache="job_summaries", result="miss" if summary is None else "hit")
+        if summary is None:
+            summary = await job_summary_batcher.submit(job_html)
+            # The batch runs outside any request, so the failure is reported here
+            if summary == UM6PCareerAdvisor.SUMMARY_FAILED:
+                mark_degraded("job_summaries")
+            else:
+                await run_blocking(summary_cache.set, cache_key, summary)
+        return summary
+
+    @staticmethod
+    async def iter_job_details(html_content, limit=None):
+        """Parse the listings, then fetch and summarise each one concurrently.
+
+        Yields `(position, job_info)` pairs in completion order. At most
+        JOB_DETAIL_CONCURRENCY listings are enriched at once. A listing that misses
+        JOB_DETAIL_TIMEOUT is still yielded, with its description set to
+        DESCRIPTION_UNAVAILABLE.
+        """
+        limit = limit or UM6PCareerAdvisor.JOB_LISTING_LIMIT
+        jobs = await run_blocking(UM6PCareerAdvisor.parse_job_listings, html_content, limit)
+        semaphore = asyncio.Semaphore(UM6PCareerAdvisor.JOB_DETAIL_CONCURRENCY)
+
+        async def enrich(position, job_info):
+            # The per-listing timeout starts once a slot is free, not while queued for one
+            async with semaphore:
+                try:
+                    job_info['description'] = await asyncio.wait_for(
+                        UM6PCareerAdvisor.describe_job(job_info['job_url']), UM6PCareerAdvisor.JOB_DETAIL_TIMEOUT
+                    )
+                except (asyncio.TimeoutError, UpstreamUnavailable):
+                    print(f"Timed out describing job: {job_info['job_url']}")
+                    mark_degraded("job_details")
+                    job_info['description'] = UM6PCareerAdvisor.DESCRIPTION_UNAVAILABLE
+            return position, job_info
+
+        for next_done in asyncio.as_completed([enrich(position, job_info) for position, job_info in enumerate(jobs)]):
+            yield await next_done
+
+    @staticmethod
+    async def extract_job_details(html_content, limit=None):
+        with timed("scrape:jobs"):
+            ready = [item async for item in UM6PCareerAdvisor.iter_job_details(html_content, limit)]
+        return [job_info for _, job_info in sorted(ready, key=lambda item: item[0])]
+
     @staticmethod
     def extract_date(date_text):
         if not date_text or date_text.strip() == "(TBD)":
@@ -183,43 +1745,73 @@ class UM6PCareerAdvisor:
             return date_text.strip()
 
     @staticmethod
-    def scrape_programs(url):
-        os.environ["GROQ_API_KEY"] = UM6PCareerAdvisor.api_keys["scrape_programs"]
-        response = requests.get(url)
+    def parse_programs(html_content):
         programs = []
-        
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            program_divs = soup.find_all('div', class_='relative w-full px-8 py-12 bg-gray-100 rounded-lg')
-            
-            for program in program_divs:
-                program_data = {
-                    'name': program.find('h1').text.strip() if program.find('h1') else "",
-                    'type': program.find('div', class_=lambda x: x and '-top-4' in x).text.strip() if program.find('div', class_=lambda x: x and '-top-4' in x) else "",
-                    'start_date': UM6PCareerAdvisor.extract_date(program.find('span', string=lambda x: x and not x.isspace() and not x == "(TBD)").text if program.find('span', string=lambda x: x and not x.isspace() and not x == "(TBD)") else ""),
-                    'location': program.find('span', class_='font-medium', string=lambda x: 'UM6P' in str(x) if x else False).text.strip() if program.find('span', class_='font-medium', string=lambda x: 'UM6P' in str(x) if x else False) else "",
-                    'description': program.find('div', class_='my-5').text.strip() if program.find('div', class_='my-5') else "",
-                    'program_url': program.find('a', href=lambda x: '/program/' in str(x) if x else False)['href'] if program.find('a', href=lambda x: '/program/' in str(x) if x else False) else "",
-                    'brochure_url': program.find('a', href=lambda x: '.pdf' in str(x) if x else False)['href'] if program.find('a', href=lambda x: '.pdf' in str(x) if x else False) else ""
-                }
-                programs.append(program_data)
+        program_class = 'relative w-full px-8 py-12 bg-gray-100 rounded-lg'
+        soup = parse_containers(html_content, 'div', program_class)
+        program_divs = soup.find_all('div', class_=program_class)
+
+        for program in program_divs:
+            start_elem = program.find('span', string=lambda x: x and not x.isspace() and not x == "(TBD)")
+            program_link = program.find('a', href=lambda x: '/program/' in str(x) if x else False)
+            brochure_link = program.find('a', href=lambda x: '.pdf' in str(x) if x else False)
+            program_data = {
+                'name': element_text(program.find('h1')),
+                'type': element_text(program.find('div', class_=lambda x: x and '-top-4' in x)),
+                'start_date': UM6PCareerAdvisor.extract_date(start_elem.text if start_elem else ""),
+                'location': element_text(program.find('span', class_='font-medium', string=lambda x: 'UM6P' in str(x) if x else False)),
+                'description': element_text(program.find('div', class_='my-5')),
+                'program_url': program_link['href'] if program_link else "",
+                'brochure_url': brochure_link['href'] if brochure_link else ""
+            }
+            programs.append(program_data)
         
         return programs
 
     @staticmethod
-    def extract_text_from_pdf(pdf_file):
+    async def scrape_programs(url):
+        os.environ["GROQ_API_KEY"] = UM6PCareerAdvisor.api_keys["scrape_programs"]
+        with timed("scrape:programs"):
+            response = await UM6PCareerAdvisor.fetch(url)
+
+            if response.status_code == 200:
+                return await run_blocking(UM6PCareerAdvisor.parse_programs, response.text)
+            return []
+
+    @staticmethod
+    def extract_text_from_pdf(pdf_file, max_pages=None, max_chars=None, time_budget=None):
+        """Extract the CV text, stopping at the page, character or time budget.
+
+        The budgets default to PDF_MAX_PAGES, PDF_MAX_CHARS and PDF_TIME_BUDGET. The
+        time budget is checked between pages, so whatever was extracted before it ran
+        out is returned. In the PDF worker pool an RLIMIT_CPU limit also interrupts a
+        single page, or the initial parse, that overruns it.
+        """
         os.environ["GROQ_API_KEY"] = UM6PCareerAdvisor.api_keys["extract_text_from_pdf"]
+        max_pages = max_pages or UM6PCareerAdvisor.PDF_MAX_PAGES
+        max_chars = max_chars or UM6PCareerAdvisor.PDF_MAX_CHARS
+        deadline = time.monotonic() + (time_budget or UM6PCareerAdvisor.PDF_TIME_BUDGET)
+
         pdf_reader = PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        parts = []
+        chars = 0
+        for page_number, page in enumerate(pdf_reader.pages):
+            if page_number >= max_pages or chars >= max_chars:
+                break
+            if time.monotonic() > deadline:
+                print(f"PDF time budget exhausted after {page_number} pages")
+                break
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            chars += len(page_text)
+        return "".join(parts)[:max_chars]
 
     
 
     @staticmethod
-    def get_career_recommendation(text):
-        client = Groq(api_key=UM6PCareerAdvisor.api_keys["get_career_recommendation"])
+    async def get_career_recommendation(text):
+        client = UM6PCareerAdvisor.llm_client("get_career_recommendation")
+        text = cv_prompt_text(text, "get_career_recommendation")
         prompt = f"""Based on the following CV text, recommend ONE of these available themes that are very related to the CV text:
 
             Available themes:
@@ -250,7 +1842,7 @@ class UM6PCareerAdvisor:
             Return only the theme name exactly as listed above, without any additional explanation or introduction text. The output should be directly the theme"""
         
         try:
-            response = client.chat.completions.create(
+            response = await UM6PCareerAdvisor.complete(client, "get_career_recommendation",
                 model="llama3-70b-8192",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=50,
@@ -262,127 +1854,239 @@ class UM6PCareerAdvisor:
             print(output)
             return output
         
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"API Error: {str(e)}")
 
 
     @staticmethod
-    def get_course_details(url):
+    def parse_course_details(html_content):
+        # Every field we read lives in a div, so nothing else needs to be built
+        soup = parse_html(html_content, 'div')
+        
+        try:
+            # Course description
+            description = element_text(soup.find('div', {'class': 'content-inner'}), 'N/A')
+            
+            # Duration
+            duration = 'N/A'
+            duration_elem = soup.find('div', string=lambda x: x and 'Approx.' in x)
+            months_elem = None if duration_elem else soup.find('div', string=lambda x: x and 'months to complete' in str(x).lower())
+            time_elem = None if duration_elem or months_elem else soup.find('div', string=lambda x: x and 'time to complete' in str(x).lower())
+            if duration_elem:
+                duration = duration_elem.text.strip()
+            elif months_elem:
+                duration = months_elem.text.strip()
+            elif time_elem:
+                duration = time_elem.find_next('div').text.strip()
+            
+            # Recommended experience
+            recommended = 'N/A'
+            level_elem = soup.find('div', string=lambda x: x and 'level' in str(x).lower())
+            if level_elem:
+                full_text = level_elem.find_next('div').text.strip()
+                if 'beginner' in full_text.lower():
+                    recommended = 'Beginner level'
+                elif 'intermediate' in full_text.lower():
+                    recommended = 'Intermediate level'
+                elif 'advanced' in full_text.lower():
+                    recommended = 'Advanced level'
+            
+            return {
+                'description': description,
+                'duration': duration,
+                'recommended_experience': recommended
+            }
+            
+        except Exception as e:
+            print(f"Error extracting course details: {e}")
+            return None
+
+    @staticmethod
+    async def get_course_details(url):
         """Get detailed information from a course's page"""
         try:
-            response = requests.get(url)
+            response = await UM6PCareerAdvisor.fetch(url)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                try:
-                    # Course description
-                    description = soup.find('div', {'class': 'content-inner'})
-                    description = description.text.strip() if description else 'N/A'
-                    
-                    # Duration
-                    duration = 'N/A'
-                    duration_elem = soup.find('div', string=lambda x: x and 'Approx.' in x)
-                    if duration_elem:
-                        duration = duration_elem.text.strip()
-                    elif soup.find('div', string=lambda x: x and 'months to complete' in str(x).lower()):
-                        duration_elem = soup.find('div', string=lambda x: x and 'months to complete' in str(x).lower())
-                        duration = duration_elem.text.strip()
-                    elif soup.find('div', string=lambda x: x and 'time to complete' in str(x).lower()):
-                        duration_elem = soup.find('div', string=lambda x: x and 'time to complete' in str(x).lower())
-                        duration = duration_elem.find_next('div').text.strip() if duration_elem else 'N/A'
-                    
-                    # Recommended experience
-                    recommended = 'N/A'
-                    level_elem = soup.find('div', string=lambda x: x and 'level' in str(x).lower())
-                    if level_elem:
-                        full_text = level_elem.find_next('div').text.strip()
-                        if 'beginner' in full_text.lower():
-                            recommended = 'Beginner level'
-                        elif 'intermediate' in full_text.lower():
-                            recommended = 'Intermediate level'
-                        elif 'advanced' in full_text.lower():
-                            recommended = 'Advanced level'
-                    
-                    return {
-                        'description': description,
-                        'duration': duration,
-                        'recommended_experience': recommended
-                    }
-                    
-                except Exception as e:
-                    print(f"Error extracting course details: {e}")
-                    return None
-                    
+                return await run_blocking(UM6PCareerAdvisor.parse_course_details, response.text)
             return None
             
         except Exception as e:
             print(f"Error fetching course page: {e}")
+            mark_degraded("course_details")
             return None
 
     @staticmethod
-    def search_coursera_courses(search_term):
-        """Search Coursera courses using BeautifulSoup"""
+    def parse_course_cards(html_content, limit=3):
+        """Parse the Coursera search results page into basic course dicts"""
+        soup = parse_containers(html_content, 'div', 'cds-ProductCard-content', limit)
+        course_cards = soup.find_all('div', class_='cds-ProductCard-content', limit=limit)
+        
+        courses = []
+        for card in course_cards:
+            try:
+                # Extract basic info
+                title = card.find('h3', class_='cds-CommonCard-title').text.strip()
+                provider = card.find('p', class_='cds-ProductCard-partnerNames').text.strip()
+                url_elem = card.find('a', class_='cds-119')
+                url = f"https://www.coursera.org{url_elem['href']}" if url_elem else 'N/A'
+                
+                # Initialize course info with required fields
+                courses.append({
+                    'title': title,
+                    'provider': provider,
+                    'url': url,
+                    'duration': 'N/A',
+                    'description': None,
+                    'recommended_experience': None
+                })
+                
+            except (AttributeError, KeyError) as e:
+                print(f"Error extracting course info: {e}")
+                continue
+        return courses
+
+    @staticmethod
+    async def complete_course_info(course_info):
+        """Fill in a search result with the details from its course page"""
+        details = await UM6PCareerAdvisor.get_course_details(course_info['url']) if course_info['url'] != 'N/A' else None
+        if details:
+            # Only update the fields we want
+            description = details.get('description', None)
+            if description:
+                first_sentence = description.split('.', 1)[0] + '...'
+            course_info['description'] = first_sentence
+            course_info.update({
+                'duration': details.get('duration', 'N/A'),
+                'recommended_experience': details.get('recommended_experience', None)
+            })
+        if course_info['duration'] == 'N/A':
+            course_info['duration'] = f"Approx {random.randint(14, 30)} hours"
+    
+        if course_info['recommended_experience'] == 'N/A':
+            course_info['recommended_experience'] = random.choice(["Beginner", "Intermediate", "Advanced"])
+        return course_info
+
+    @staticmethod
+    async def iter_coursera_courses(search_term):
+        """Search Coursera and yield `(position, course_info)` pairs as each detail page is processed"""
         os.environ["GROQ_API_KEY"] = UM6PCareerAdvisor.api_keys["search_coursera_courses"]
         url = f"https://www.coursera.org/search?query={search_term.strip()}"
         
-        response = requests.get(url)
+        response = await UM6PCareerAdvisor.fetch(url)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            course_cards = soup.find_all('div', class_='cds-ProductCard-content')
+            courses = await run_blocking(UM6PCareerAdvisor.parse_course_cards, response.text)
             
-            courses = []
-            for card in course_cards[:3]:
-                try:
-                    # Extract basic info
-                    title = card.find('h3', class_='cds-CommonCard-title').text.strip()
-                    provider = card.find('p', class_='cds-ProductCard-partnerNames').text.strip()
-                    url_elem = card.find('a', class_='cds-119')
-                    url = f"https://www.coursera.org{url_elem['href']}" if url_elem else 'N/A'
-                    
-                    # Initialize course info with required fields
-                    course_info = {
-                        'title': title,
-                        'provider': provider,
-                        'url': url,
-                        'duration': 'N/A',
-                        'description': None,
-                        'recommended_experience': None
-                    }
-                    import random
-                    # Get detailed course information
-                    details = UM6PCareerAdvisor.get_course_details(url) if url != 'N/A' else None
-                    if details:
-                        # Only update the fields we want
-                        description = details.get('description', None)
-                        if description:
-                            first_sentence = description.split('.', 1)[0] + '...'
-                        course_info['description'] = first_sentence
-                        course_info.update({
-                            'duration': details.get('duration', 'N/A'),
-                            'recommended_experience': details.get('recommended_experience', None)
-                        })
-                    if course_info['duration'] == 'N/A':
-                        course_info['duration'] = f"Approx {random.randint(14, 30)} hours"
-                
-                    if course_info['recommended_experience'] == 'N/A':
-                        course_info['recommended_experience'] = random.choice(["Beginner", "Intermediate", "Advanced"])
-                
-                    
-                    courses.append(course_info)
-                    time.sleep(1)  # Add delay between requests
-                    
-                except (AttributeError, KeyError) as e:
-                    print(f"Error extracting course info: {e}")
-                    continue
-                    
-            return courses
+            async def complete(position, course_info):
+                return position, await UM6PCareerAdvisor.complete_course_info(course_info)
+
+            # Fetch every detail page at once; the shared rate limiter keeps us polite
+            for next_done in asyncio.as_completed([complete(position, course_info) for position, course_info in enumerate(courses)]):
+                yield await next_done
         else:
             print(f"Failed to fetch courses for '{search_term}'. Status code: {response.status_code}")
-            return []
 
     @staticmethod
-    def extract_profile_info(text) -> Dict[str, Any]:
-        client = Groq(api_key=UM6PCareerAdvisor.api_keys["extract_profile_info"])
+    async def search_coursera_courses(search_term):
+        """Search Coursera courses using BeautifulSoup"""
+        with timed("scrape:courses"):
+            ready = [item async for item in UM6PCareerAdvisor.iter_coursera_courses(search_term)]
+        return [course_info for _, course_info in sorted(ready, key=lambda item: item[0])]
+
+    @staticmethod
+    async def get_course_topic(text):
+        client = UM6PCareerAdvisor.llm_client("recommend_courses")
+        text = cv_prompt_text(text, "get_course_topic")
+        prompt = """Analyze the following CV content and suggest only one specific topic
+        that would be valuable for the person to learn based on their current experience. 
+        Format the response as a simple search terms, without any additional
+        text or explanations. Make sure that the topic is very related with the CV.
+
+        CV Content:
+        {cv_content}
+        """
+        
+        response = await UM6PCareerAdvisor.complete(client, "get_course_topic",
+            model="llama3-70b-8192",
+            messages=[
+                {"role": "system", "content": "You are a career development advisor who suggests relevant courses."},
+                {"role": "user", "content": prompt.format(cv_content=text)}
+            ],
+            max_tokens=100,
+            temperature=0.7
+        )
+        return response.choices[0].message.content.strip()
+
+    @staticmethod
+    async def answer_cv_questions(text) -> Dict[str, Any]:
+        """Ask for the theme, job title, course topic and profile in one completion.
+
+        Returns only the answers that parsed and validated; callers ask the dedicated
+        helpers for anything missing.
+        """
+        client = UM6PCareerAdvisor.llm_client("get_career_recommendation")
+        text = cv_prompt_text(text, "answer_cv_questions")
+        themes = "\n".join(f"- {theme}" for theme in UM6PCareerAdvisor.SPECIFIC_THEMES)
+        prompt = f"""Analyze the following CV and answer four questions about the candidate:
+
+        1. "theme": ONE of these available themes that is very related to the CV, exactly as listed:
+        {themes}
+        2. "job_title": ONE specific job title that best matches the candidate's profile, considering their skills, experience, career growth potential and market demand in Morocco.
+        3. "course_topic": ONE specific topic, as simple search terms, that would be valuable for the person to learn based on their current experience.
+        4. "profile": the candidate's full_name, location ("City, Country"), email, phone and their 4 main key_skills.
+
+        Return only a JSON object, nothing else:
+        {{
+            "theme": "Theme",
+            "job_title": "Job Title",
+            "course_topic": "Topic",
+            "profile": {{
+                "full_name": "Candidate Name",
+                "location": "City, Country",
+                "email": "email@example.com",
+                "phone": "+1234567890",
+                "key_skills": ["Skill 1", "Skill 2", "Skill 3", "Skill 4"]
+            }}
+        }}
+
+        CV Text:
+        {text}"""
+
+        try:
+            response = await UM6PCareerAdvisor.complete(client, "answer_cv_questions",
+                model="llama3-70b-8192",
+                messages=[
+                    {"role": "system", "content": "You are a career development advisor that only returns valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=600,
+                temperature=0.3
+            )
+            parsed = extract_json_object(response.choices[0].message.content)
+        except Exception as e:
+            print(f"Error in answer_cv_questions: {str(e)}")
+            return {}
+
+        answers = {}
+        theme = parsed.get("theme")
+        if isinstance(theme, str) and any(known in theme for known in UM6PCareerAdvisor.SPECIFIC_THEMES):
+            answers["career_recommendation"] = theme.strip()
+        for stage, field in (("job_recommendation", "job_title"), ("course_topic", "course_topic")):
+            value = parsed.get(field)
+            if isinstance(value, str) and value.strip():
+                answers[stage] = value.strip()
+        profile = parsed.get("profile")
+        if isinstance(profile, dict) and all(field in profile for field in ["full_name", "location", "email", "phone", "key_skills"]):
+            if not isinstance(profile["key_skills"], list):
+                profile["key_skills"] = [profile["key_skills"]]
+            answers["profile"] = profile
+        return answers
+
+    @staticmethod
+    async def extract_profile_info(text) -> Dict[str, Any]:
+        client = UM6PCareerAdvisor.llm_client("extract_profile_info")
+        text = cv_prompt_text(text, "extract_profile_info")
         prompt = f"""You are a CV parser. Extract information from the CV text and return it in valid JSON format.
         Only return the JSON object, nothing else.
         
@@ -399,7 +2103,7 @@ class UM6PCareerAdvisor:
         {text}"""
         
         try:
-            response = client.chat.completions.create(
+            response = await UM6PCareerAdvisor.complete(client, "extract_profile_info",
                 model="llama3-70b-8192",
                 messages=[
                     {"role": "system", "content": "You are a CV parser that only returns valid JSON."},
@@ -412,46 +2116,230 @@ class UM6PCareerAdvisor:
             # Get the response text
             response_text = response.choices[0].message.content.strip()
             
-            # Extract JSON object using string manipulation
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON object found in response")
-                
-            json_str = response_text[start_idx:end_idx]
-            
-            # Try to parse the JSON
             try:
-                parsed_json = json.loads(json_str)
-                
-                # Validate the required fields
-                required_fields = ["full_name", "location", "email", "phone", "key_skills"]
-                for field in required_fields:
-                    if field not in parsed_json:
-                        raise ValueError(f"Missing required field: {field}")
-                    
-                # Ensure key_skills is a list
-                if not isinstance(parsed_json["key_skills"], list):
-                    parsed_json["key_skills"] = [parsed_json["key_skills"]]
-                    
-                return parsed_json
-                
+                parsed_json = extract_json_object(response_text)
             except json.JSONDecodeError as e:
                 print(f"JSON parsing error: {str(e)}")
-                print(f"Attempted to parse: {json_str}")
-                return {
-                    "full_name": "Unknown",
-                    "location": "Not specified",
-                    "email": "Not specified",
-                    "phone": "Not specified",
-                    "key_skills": ["Not specified"]
-                }
+                print(f"Attempted to parse: {response_text}")
+                mark_degraded("profile")
+                return dict(UM6PCareerAdvisor.PROFILE_NOT_FOUND)
+
+            # Validate the required fields
+            required_fields = ["full_name", "location", "email", "phone", "key_skills"]
+            for field in required_fields:
+                if field not in parsed_json:
+                    raise ValueError(f"Missing required field: {field}")
+                
+            # Ensure key_skills is a list
+            if not isinstance(parsed_json["key_skills"], list):
+                parsed_json["key_skills"] = [parsed_json["key_skills"]]
+                
+            return parsed_json
                 
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             print(f"Error in extract_profile_info: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to extract profile info: {str(e)}")
 
+async def load_theme_programs(theme):
+    programs = await UM6PCareerAdvisor.scrape_programs(UM6PCareerAdvisor.THEME_URLS[theme])
+    # The catalogue is the best description of what a theme covers
+    theme_matcher.add_documents(theme, [f"{p['name']} {p['description']}" for p in programs])
+    return programs
+
+# The UM6P catalogue changes rarely: keep each theme's listing for PROGRAM_CACHE_TTL
+# seconds and serve it stale (while refreshing) for PROGRAM_CACHE_STALE_TTL more
+program_cache = AsyncTTLCache(
+    load_theme_programs,
+    ttl=float(os.getenv("PROGRAM_CACHE_TTL", 6 * 3600)),
+    stale_ttl=float(os.getenv("PROGRAM_CACHE_STALE_TTL", 24 * 3600)),
+    name="programs",
+)
+
+# Theme selection: THEME_MATCHER=local ranks the themes with a TF-IDF matcher instead of
+# an LLM completion; with THEME_MATCHER_LLM_FALLBACK=1, a top score under
+# THEME_MATCHER_MIN_SCORE (or within THEME_MATCHER_MIN_MARGIN of the runner-up) is
+# referred to the LLM
+THEME_MATCHER = os.getenv("THEME_MATCHER", "llm")
+THEME_MATCHER_TOP_K = int(os.getenv("THEME_MATCHER_TOP_K", 3))
+THEME_MATCHER_MIN_SCORE = float(os.getenv("THEME_MATCHER_MIN_SCORE", 0.05))
+THEME_MATCHER_MIN_MARGIN = float(os.getenv("THEME_MATCHER_MIN_MARGIN", 0.01))
+THEME_MATCHER_LLM_FALLBACK = os.getenv("THEME_MATCHER_LLM_FALLBACK", "0") == "1"
+theme_matcher = ThemeMatcher(UM6PCareerAdvisor.THEME_DESCRIPTIONS)
+
+# Profile extraction: PROFILE_EXTRACTOR=local (the default) fills the profile with the
+# rule-based extractor and asks the LLM only for the fields it couldn't determine,
+# including key skills when fewer than PROFILE_MIN_SKILLS were found;
+# PROFILE_EXTRACTOR=llm always asks the LLM
+PROFILE_EXTRACTOR = os.getenv("PROFILE_EXTRACTOR", "local")
+PROFILE_MIN_SKILLS = int(os.getenv("PROFILE_MIN_SKILLS", 3))
+PROFILE_MAX_SKILLS = 4
+profile_extractor = ProfileExtractor(
+    UM6PCareerAdvisor.PROFILE_SKILLS, UM6PCareerAdvisor.PROFILE_SKILL_ALIASES, UM6PCareerAdvisor.PROFILE_CITIES,
+)
+
+# Concurrent job summaries (within and across requests) are merged into one completion
+job_summary_batcher = MicroBatcher(
+    UM6PCareerAdvisor.summarize_job_batch,
+    window=float(os.getenv("LLM_BATCH_WINDOW_MS", 50)) / 1000,
+    max_items=int(os.getenv("LLM_BATCH_MAX_ITEMS", 8)),
+    max_chars=int(os.getenv("LLM_BATCH_MAX_CHARS", 24000)),
+)
+
+async def warm_program_cache():
+    """Pre-fetch the program listing of every theme"""
+    await asyncio.gather(
+        *(program_cache.get(theme) for theme in UM6PCareerAdvisor.THEME_URLS),
+        return_exceptions=True,
+    )
+
+class CatalogIndex:
+    """Local SQLite index of scraped programs, jobs and courses.
+
+    Items are stored per (kind, query) -- a theme, job title or course topic -- in the
+    order the live scraper returned them, with an FTS5 table over their text so a
+    lookup can rank them against the CV's key skills. Lookups record when each query
+    was last requested, and queries nobody has requested for `query_ttl` seconds are
+    pruned with their items. Like SQLiteCache, methods block on disk I/O, so call them
+    through `run_blocking` from async code.
+    """
+
+    def __init__(self, path: str, max_age: float, query_ttl: float):
+        self.path = path
+        self.max_age = max_age
+        self.query_ttl = query_ttl
+        self.lock = threading.Lock()
+        self.conn = None
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = open_sqlite(
+                self.path,
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, query TEXT NOT NULL, "
+                "position INTEGER NOT NULL, data TEXT NOT NULL, indexed_at REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS items_kind_query ON items (kind, query)",
+                "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts "
+                "USING fts5(body, tokenize='unicode61 remove_diacritics 2')",
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "kind TEXT NOT NULL, query TEXT NOT NULL, requested_at REAL NOT NULL, "
+                "PRIMARY KEY (kind, query))",
+            )
+        return self.conn
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def store(self, kind: str, query: str, items: List[Dict[str, Any]], fresh: bool = True):
+        """Replace the items indexed for `query` with a new crawl.
+
+        Items stored with fresh=False count as stale straight away: lookups miss them
+        and only `include_stale` returns them.
+        """
+        query = self.normalize_query(query)
+        now = time.time() if fresh else 0
+        with self.lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                stale_ids = [(row[0],) for row in conn.execute("SELECT id FROM items WHERE kind = ? AND query = ?", (kind, query))]
+                conn.executemany("DELETE FROM items_fts WHERE rowid = ?", stale_ids)
+                conn.executemany("DELETE FROM items WHERE id = ?", stale_ids)
+                for position, item in enumerate(items):
+                    cursor = conn.execute(
+                        "INSERT INTO items (kind, query, position, data, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                        (kind, query, position, json.dumps(item), now),
+                    )
+                    body = " ".join(str(value) for value in item.values() if value)
+                    conn.execute("INSERT INTO items_fts (rowid, body) VALUES (?, ?)", (cursor.lastrowid, body))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def lookup(self, kind: str, query: str, skills: Optional[List[str]] = None, include_stale: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Return the fresh items for `query` (best skill matches first), or None on a miss.
+
+        With `include_stale`, items older than `max_age` are returned too.
+        """
+        query = self.normalize_query(query)
+        terms = {word for skill in skills or [] for word in tokenize(skill)}
+        indexed_after = 0 if include_stale else time.time() - self.max_age
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO queries (kind, query, requested_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (kind, query) DO UPDATE SET requested_at = excluded.requested_at",
+                (kind, query, time.time()),
+            )
+            if terms:
+                rows = conn.execute(
+                    "SELECT i.data FROM items i LEFT JOIN ("
+                    "SELECT rowid, bm25(items_fts) AS score FROM items_fts WHERE items_fts MATCH ?"
+                    ") m ON m.rowid = i.id "
+                    "WHERE i.kind = ? AND i.query = ? AND i.indexed_at >= ? "
+                    "ORDER BY m.score IS NULL, m.score, i.position",
+                    (" OR ".join(f'"{term}"' for term in sorted(terms)), kind, query, indexed_after),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT data FROM items WHERE kind = ? AND query = ? AND indexed_at >= ? ORDER BY position",
+                    (kind, query, indexed_after),
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows] or None
+
+    def queries(self, kind: str, limit: int) -> List[str]:
+        """The `limit` most recently requested queries, if requested within `query_ttl`"""
+        with self.lock:
+            conn = self._connect()
+            return [row[0] for row in conn.execute(
+                "SELECT query FROM queries WHERE kind = ? AND requested_at >= ? ORDER BY requested_at DESC LIMIT ?",
+                (kind, time.time() - self.query_ttl, limit),
+            )]
+
+    def prune(self, kind: str, keep: List[str]):
+        """Delete the items of every query not in `keep` and not requested within `query_ttl`"""
+        keep = {self.normalize_query(query) for query in keep}
+        cutoff = time.time() - self.query_ttl
+        with self.lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                recent = {row[0] for row in conn.execute(
+                    "SELECT query FROM queries WHERE kind = ? AND requested_at >= ?", (kind, cutoff)
+                )}
+                indexed = {row[0] for row in conn.execute("SELECT DISTINCT query FROM items WHERE kind = ?", (kind,))}
+                for query in indexed - keep - recent:
+                    stale_ids = [(row[0],) for row in conn.execute("SELECT id FROM items WHERE kind = ? AND query = ?", (kind, query))]
+                    conn.executemany("DELETE FROM items_fts WHERE rowid = ?", stale_ids)
+                    conn.executemany("DELETE FROM items WHERE id = ?", stale_ids)
+                conn.execute("DELETE FROM queries WHERE kind = ? AND requested_at < ?", (kind, cutoff))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+# Local catalogue index (CATALOG_INDEX=1): endpoints answer from the index and only
+# scrape live on a miss; a background job re-crawls every theme, the
+# CATALOG_MAX_QUERIES most recently requested job titles and course topics (plus
+# CATALOG_JOB_TITLES / CATALOG_COURSE_TOPICS) every CATALOG_REFRESH_INTERVAL seconds.
+# Items older than CATALOG_MAX_AGE count as misses, and titles and topics nobody has
+# requested for CATALOG_QUERY_TTL seconds are dropped from the index.
+CATALOG_INDEX = os.getenv("CATALOG_INDEX", "0") == "1"
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", 6 * 3600))
+CATALOG_RANK_BY_SKILLS = os.getenv("CATALOG_RANK_BY_SKILLS", "0") == "1"
+CATALOG_MAX_QUERIES = int(os.getenv("CATALOG_MAX_QUERIES", 100))
+catalog_index = CatalogIndex(
+    os.path.join(CACHE_DIR, "catalog.sqlite3"),
+    max_age=float(os.getenv("CATALOG_MAX_AGE", 24 * 3600)),
+    query_ttl=float(os.getenv("CATALOG_QUERY_TTL", 7 * 24 * 3600)),
+)
+
+def seed_queries(name: str) -> List[str]:
+    return [query.strip() for query in os.getenv(name, "").split(",") if query.strip()]
+
 class Program(BaseModel):
     name: str
     type: str
@@ -470,9 +2358,14 @@ class Job(BaseModel):
     remote_status: str
     job_url: str
 
+class ThemeScore(BaseModel):
+    theme: str
+    score: float
+
 class RecommendationResponse(BaseModel):
     recommended_theme: str
     programs: List[Program]
+    theme_scores: List[ThemeScore] = []
 
 class JobRecommendationResponse(BaseModel):
     recommended_job: str
@@ -497,75 +2390,525 @@ class CourseRecommendationResponse(BaseModel):
     recommended_topics: List[str]
     courses: List[Course]
 
-# API Endpoints
-@app.post("/recommend-education", response_model=RecommendationResponse)
-async def recommend_education(file: UploadFile = File(...)):
-    contents = await file.read()
-    cv_text =  UM6PCareerAdvisor.extract_text_from_pdf(io.BytesIO(contents))
-    
-    recommended_theme =  UM6PCareerAdvisor.get_career_recommendation(cv_text)
+class AnalysisResponse(BaseModel):
+    education: RecommendationResponse
+    jobs: JobRecommendationResponse
+    profile: ProfileInfo
+    coursera: CourseRecommendationResponse
+
+class TaskStatus(BaseModel):
+    task_id: str
+    pipeline: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+# Results derived from a CV, keyed by a hash of the uploaded bytes (extracted text) or of
+# the normalised text (LLM answers), so repeat uploads skip the PDF parser and Groq
+cv_cache = TieredCache(
+    LRUCache(int(os.getenv("CV_CACHE_MEMORY_ITEMS", 1024)), ttl=float(os.getenv("CV_CACHE_TTL", 7 * 24 * 3600))),
+    SQLiteCache(
+        os.path.join(CACHE_DIR, "cv_analysis.sqlite3"),
+        max_bytes=int(os.getenv("CV_CACHE_MAX_MB", 256)) * 1024 * 1024,
+        ttl=float(os.getenv("CV_CACHE_TTL", 7 * 24 * 3600)),
+    ),
+    name="cv",
+)
+
+def normalize_cv_text(cv_text: str) -> str:
+    return " ".join(cv_text.split())
+
+# Pool workers also get an RLIMIT_CPU soft limit for each document, so a parse that is
+# stuck inside one page or in PdfReader's xref parsing (where the between-page budget
+# check never runs) is interrupted by SIGXCPU. Not available on Windows.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class PDFTimeBudgetExceeded(Exception):
+    pass
+
+_cpu_limit_active = False
+
+def _cpu_budget_exceeded(signum, frame):
+    # SIGXCPU repeats every second while over the limit; ignore one that lands between jobs
+    if _cpu_limit_active:
+        raise PDFTimeBudgetExceeded("PDF time budget exhausted")
+
+@contextmanager
+def cpu_time_limit(seconds: float):
+    """Raise PDFTimeBudgetExceeded once this process has used `seconds` more CPU time"""
+    global _cpu_limit_active
+    if resource is None:
+        yield
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    limit = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    _cpu_limit_active = True
+    try:
+        yield
+    finally:
+        _cpu_limit_active = False
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+# Each pool worker reports the job it is parsing, and since when, in shared arrays with
+# one slot per worker; in-process (thread pool) parses report in _thread_jobs. Parse
+# timeouts run from there, so time spent queued behind other CVs doesn't count.
+_worker_slot = None
+_worker_jobs = None
+_worker_job_started = None
+_thread_jobs: Dict[int, float] = {}
+
+def init_pdf_worker(next_slot, jobs, job_started):
+    global _worker_slot, _worker_jobs, _worker_job_started
+    with next_slot.get_lock():
+        _worker_slot = next_slot.value
+        next_slot.value += 1
+    _worker_jobs, _worker_job_started = jobs, job_started
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _cpu_budget_exceeded)
+
+def report_pdf_job(job_id: int, started: float):
+    """Record that `job_id` started parsing at `started` (time.time()), or finished if 0"""
+    if _worker_jobs is None:
+        if started:
+            _thread_jobs[job_id] = started
+        else:
+            _thread_jobs.pop(job_id, None)
+    elif started:
+        _worker_job_started[_worker_slot] = started
+        _worker_jobs[_worker_slot] = job_id
+    else:
+        _worker_jobs[_worker_slot] = 0
+        _worker_job_started[_worker_slot] = 0.0
+
+def parse_pdf_bytes(data: bytes, job_id: int = 0, cpu_limit: bool = False):
+    """Worker entry point: return the CV text and the seconds spent parsing it"""
+    started = time.perf_counter()
+    report_pdf_job(job_id, time.time())
+    try:
+        if cpu_limit:
+            with cpu_time_limit(UM6PCareerAdvisor.PDF_TIME_BUDGET):
+                text = UM6PCareerAdvisor.extract_text_from_pdf(io.BytesIO(data))
+        else:
+            text = UM6PCareerAdvisor.extract_text_from_pdf(io.BytesIO(data))
+    finally:
+        report_pdf_job(job_id, 0.0)
+    return text, time.perf_counter() - started
+
+def warm_pdf_worker():
+    return os.getpid()
+
+class PDFExtractionService:
+    """Parses CVs in a pool of worker processes so extraction scales with cores.
+
+    PDF parsing is pure-Python and holds the GIL, so the thread pool only ever parses
+    one CV at a time per uvicorn worker. With workers=0 the service falls back to the
+    thread pool (useful on single-core hosts and in development).
+
+    A document's timeout starts when a worker picks it up, never while it is queued.
+    A document still parsing when its timeout expires can't be cancelled, so the
+    pool's workers are killed and the pool replaced rather than left pinned; the other
+    documents it was parsing are retried on the new pool. In the thread pool the
+    timeout only abandons the wait.
+    """
+
+    # How often (seconds) a queued job checks whether a worker has picked it up
+    JOB_START_POLL_INTERVAL = 0.05
+
+    def __init__(self, workers: int, start_method: str = "spawn"):
+        self.workers = workers
+        self.start_method = start_method
+        self.executor: Optional[ProcessPoolExecutor] = None
+        # Shared arrays the current pool's workers report their jobs in
+        self.job_board: Optional[tuple] = None
+        # Pools killed by recycle(), whose other jobs are retried
+        self.recycled = weakref.WeakSet()
+        self.job_ids = itertools.count(1)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.parse_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_parse_seconds = 0.0
+
+    def start(self):
+        """Create the pool and spawn every worker up front so no request pays for it"""
+        if self.executor is None and self.workers > 0:
+            context = multiprocessing.get_context(self.start_method)
+            jobs = context.Array("q", self.workers, lock=False)
+            job_started = context.Array("d", self.workers, lock=False)
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=init_pdf_worker,
+                initargs=(context.Value("i", 0), jobs, job_started),
+            )
+            self.job_board = (jobs, job_started)
+            for _ in range(self.workers):
+                self.executor.submit(warm_pdf_worker)
+
+    def shutdown(self, wait: bool = False):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
+            self.job_board = None
+
+    def discard(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool so the next start() builds a new one.
+
+        Every request that was using the pool sees the breakage, so only the first
+        one to get here replaces it.
+        """
+        if self.executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.job_board = None
+            self.restarts += 1
+            print(f"PDF worker pool broken, restarting it (restart #{self.restarts})")
+
+    def recycle(self, executor: ProcessPoolExecutor):
+        """Kill the pool's workers so a parse that overran its timeout stops using CPU"""
+        if self.executor is executor:
+            self.timeouts += 1
+            self.recycled.add(executor)
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+            self.discard(executor)
+
+    @staticmethod
+    def job_started_at(job_board: tuple, job_id: int) -> Optional[float]:
+        jobs, job_started = job_board
+        for slot, running in enumerate(jobs):
+            if running == job_id:
+                return job_started[slot] or None
+        return None
+
+    async def wait_for_job(self, job, started_at, timeout: float):
+        """Await `job`, raising TimeoutError once it has been parsing for `timeout` seconds.
+
+        `started_at()` returns when the job started parsing, or None while it is queued.
+        """
+        deadline = None
+        while True:
+            if deadline is None:
+                started = started_at()
+                if started is not None:
+                    deadline = started + timeout
+            wait = self.JOB_START_POLL_INTERVAL if deadline is None else deadline - time.time()
+            if wait <= 0:
+                raise asyncio.TimeoutError
+            done, _ = await asyncio.wait({job}, timeout=wait)
+            if done:
+                if job.cancelled():
+                    # Shutting a pool down cancels the jobs still queued in it
+                    raise BrokenProcessPool("The PDF worker pool was shut down before the job ran")
+                return job.result()
+
+    async def run_in_pool(self, data: bytes, timeout: float):
+        # A worker that dies (OOM kill, crash on a malformed PDF) breaks the whole pool and
+        # fails every job in it, so each job is retried once on a fresh pool. Jobs caught
+        # in a pool recycled for another job's timeout are retried without using that up.
+        retried = False
+        while True:
+            self.start()
+            executor, job_board = self.executor, self.job_board
+            job_id = next(self.job_ids)
+            future = executor.submit(parse_pdf_bytes, data, job_id, True)
+            job = asyncio.wrap_future(future)
+            try:
+                return await self.wait_for_job(job, lambda: self.job_started_at(job_board, job_id), timeout)
+            except asyncio.TimeoutError:
+                job.cancel()
+                if not future.done():
+                    self.recycle(executor)
+                raise
+            except asyncio.CancelledError:
+                # Drops the job if it is still queued
+                job.cancel()
+                raise
+            except BrokenProcessPool:
+                self.discard(executor)
+                if executor in self.recycled:
+                    continue
+                if retried:
+                    raise
+                retried = True
+
+    async def run_in_thread(self, data: bytes, timeout: float):
+        job_id = next(self.job_ids)
+        job = asyncio.ensure_future(run_blocking(parse_pdf_bytes, data, job_id))
+        try:
+            return await self.wait_for_job(job, lambda: _thread_jobs.get(job_id), timeout)
+        finally:
+            # The parse itself can't be interrupted; only stop waiting for it
+            job.cancel()
+
+    async def extract(self, data: bytes, timeout: float) -> str:
+        self.start()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started = time.perf_counter()
+        try:
+            if self.executor is None:
+                text, parse_seconds = await self.run_in_thread(data, timeout)
+            else:
+                text, parse_seconds = await self.run_in_pool(data, timeout)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+        self.completed += 1
+        self.parse_seconds += parse_seconds
+        self.max_parse_seconds = max(self.max_parse_seconds, parse_seconds)
+        self.wait_seconds += time.perf_counter() - started - parse_seconds
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+            "avg_parse_seconds": self.parse_seconds / self.completed if self.completed else 0.0,
+            "max_parse_seconds": self.max_parse_seconds,
+            "avg_wait_seconds": self.wait_seconds / self.completed if self.completed else 0.0,
+        }
+
+pdf_service = PDFExtractionService(
+    workers=int(os.getenv("PDF_POOL_SIZE", os.cpu_count() or 1)),
+    start_method=os.getenv("PDF_POOL_START_METHOD", "spawn"),
+)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def hash_upload(file: UploadFile) -> str:
+    """Hash the upload in chunks (enforcing PDF_MAX_UPLOAD_BYTES) and rewind it.
+
+    Starlette has already spooled the body to a temporary file, so this never holds
+    more than one chunk in memory.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > UM6PCareerAdvisor.PDF_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="The uploaded file is too large")
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+async def extract_pdf_text(data: bytes) -> str:
+    """Parse the PDF with the extraction service under a hard per-document timeout"""
+    try:
+        with timed("pdf_extraction"):
+            return await pdf_service.extract(data, UM6PCareerAdvisor.PDF_TIME_BUDGET * 1.5)
+    except (asyncio.TimeoutError, PDFTimeBudgetExceeded):
+        raise HTTPException(status_code=422, detail="The PDF took too long to parse")
+    except PyPdfError as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the PDF: {str(e)}")
+    except BrokenProcessPool:
+        # It also killed the worker on a fresh pool, so it is most likely the PDF itself
+        raise HTTPException(status_code=422, detail="The PDF could not be parsed")
+
+async def extract_upload_text(file: UploadFile) -> str:
+    # Only read the (already size-checked) upload into memory on a cache miss
+    return await extract_pdf_text(await file.read())
+
+async def read_cv_text(file: UploadFile) -> str:
+    digest = await hash_upload(file)
+    return await cv_cache.memoize(f"pdf:{digest}", extract_upload_text, file)
+
+def cv_result_key(stage: str, cv_text: str) -> str:
+    return f"{stage}:{hashlib.sha256(normalize_cv_text(cv_text).encode('utf-8')).hexdigest()}"
+
+async def cached_cv_result(stage: str, cv_text: str, func):
+    return await cv_cache.memoize(cv_result_key(stage, cv_text), func, cv_text)
+
+CV_QUESTION_STAGES = ["career_recommendation", "job_recommendation", "course_topic", "profile"]
+
+async def prefetch_cv_answers(cv_text: str):
+    """Answer every uncached CV-level question with one combined completion.
+
+    Valid answers are stored in cv_cache, where the pipelines pick them up; anything
+    the combined call missed is left for the dedicated helper.
+    """
+    cached = await asyncio.gather(*(cv_cache.get(cv_result_key(stage, cv_text)) for stage in CV_QUESTION_STAGES))
+    if all(value is not None for value in cached):
+        return
+    answers = await UM6PCareerAdvisor.answer_cv_questions(cv_text)
+    for stage, value in zip(CV_QUESTION_STAGES, cached):
+        if value is None and stage in answers:
+            await cv_cache.set(cv_result_key(stage, cv_text), answers[stage])
+
+# Recommendation pipelines (shared by the single-purpose endpoints and /analyze-cv)
+def rank_themes(cv_text: str) -> List[ThemeScore]:
+    return [ThemeScore(theme=theme, score=score) for theme, score in theme_matcher.top_k(cv_text, THEME_MATCHER_TOP_K)]
+
+def is_confident(theme_scores: List[ThemeScore]) -> bool:
+    if not theme_scores or theme_scores[0].score < THEME_MATCHER_MIN_SCORE:
+        return False
+    return len(theme_scores) < 2 or theme_scores[0].score - theme_scores[1].score >= THEME_MATCHER_MIN_MARGIN
+
+async def recommend_theme(cv_text: str) -> Tuple[str, List[ThemeScore]]:
+    """Return the recommended theme and, in local mode, the top-k theme scores"""
+    theme_scores = []
+    if THEME_MATCHER == "local":
+        theme_scores = rank_themes(cv_text)
+        if is_confident(theme_scores) or not THEME_MATCHER_LLM_FALLBACK:
+            return theme_scores[0].theme, theme_scores
+
+    try:
+        recommended_theme = await cached_cv_result("career_recommendation", cv_text, UM6PCareerAdvisor.get_career_recommendation)
+    except UpstreamUnavailable as e:
+        # The LLM is down: the local matcher's best guess beats no recommendation
+        print(f"Falling back to the local theme matcher: {e}")
+        mark_degraded("theme")
+        theme_scores = theme_scores or rank_themes(cv_text)
+        return theme_scores[0].theme, theme_scores
     for theme in UM6PCareerAdvisor.SPECIFIC_THEMES:
         if theme in recommended_theme:
             recommended_theme = theme
     print(recommended_theme)
-    url =  UM6PCareerAdvisor.THEME_URLS.get(recommended_theme)
-    
-    if url:
-        programs =  UM6PCareerAdvisor.scrape_programs(url)
-        return RecommendationResponse(recommended_theme=recommended_theme, programs=programs)
-    else:
+    if recommended_theme not in UM6PCareerAdvisor.THEME_URLS:
         raise HTTPException(status_code=404, detail="Theme URL not found")
+    return recommended_theme, theme_scores
 
-@app.post("/recommend-jobs", response_model=JobRecommendationResponse)
-async def recommend_jobs(file: UploadFile = File(...)):
-    contents = await file.read()
-    cv_text =  UM6PCareerAdvisor.extract_text_from_pdf(io.BytesIO(contents))
-    
-    recommended_job =  UM6PCareerAdvisor.get_job_recommendation(cv_text)
+async def education_pipeline(cv_text: str) -> RecommendationResponse:
+    recommended_theme, theme_scores = await recommend_theme(cv_text)
+    programs = await catalog_items("program", recommended_theme, cv_text)
+    return RecommendationResponse(recommended_theme=recommended_theme, programs=programs, theme_scores=theme_scores)
+
+async def search_job_listings(recommended_job: str) -> str:
+    """Fetch the Bayt search results page for a job title"""
     formatted_job_title = recommended_job.replace(" ", "-").lower()
     url = f"https://www.bayt.com/en/morocco/jobs/{formatted_job_title}-jobs/"
 
     try:
-        response = requests.get(url, headers= UM6PCareerAdvisor.headers)
+        response = await UM6PCareerAdvisor.fetch(url, headers=UM6PCareerAdvisor.headers)
         if response.status_code == 200:
-            jobs =  UM6PCareerAdvisor.extract_job_details(response.text)
-            return JobRecommendationResponse(recommended_job=recommended_job, jobs=jobs)
+            return response.text
         else:
             raise HTTPException(status_code=response.status_code, detail="Failed to fetch job listings")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Error occurred: {str(e)}")
 
-@app.post("/recommend-courses", response_model=CourseRecommendationResponse)
-async def recommend_courses(file: UploadFile = File(...)):
-    contents = await file.read()
-    cv_text =  UM6PCareerAdvisor.extract_text_from_pdf(io.BytesIO(contents))
-    
-    client = Groq(api_key=UM6PCareerAdvisor.api_keys["recommend_courses"])
-    prompt = """Analyze the following CV content and suggest only one specific topic
-    that would be valuable for the person to learn based on their current experience. 
-    Format the response as a simple search terms, without any additional
-    text or explanations. Make sure that the topic is very related with the CV.
-
-    CV Content:
-    {cv_content}
-    """
-    
+async def live_jobs(recommended_job: str) -> List[Dict[str, Any]]:
+    listings_html = await search_job_listings(recommended_job)
+    return await UM6PCareerAdvisor.extract_job_details(listings_html)
+
+async def live_courses(topic: str) -> List[Dict[str, Any]]:
+    return await UM6PCareerAdvisor.search_coursera_courses(topic.strip())
+
+# Live scraper and model for each kind of catalogue item
+CATALOG_SOURCES = {
+    "program": (Program, program_cache.get),
+    "job": (Job, live_jobs),
+    "course": (Course, live_courses),
+}
+
+async def cv_skills(cv_text: str) -> List[str]:
+    if not CATALOG_RANK_BY_SKILLS:
+        return []
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[
-                {"role": "system", "content": "You are a career development advisor who suggests relevant courses."},
-                {"role": "user", "content": prompt.format(cv_content=cv_text)}
-            ],
-            max_tokens=100,
-            temperature=0.7
-        )
-        
-        suggested_topics = [response.choices[0].message.content.strip()]
+        profile_data = await cached_cv_result("profile", cv_text, extract_cv_profile)
+        return list(profile_data.get("key_skills") or [])
+    except Exception as e:
+        print(f"Error getting key skills for ranking: {str(e)}")
+        return []
+
+async def lookup_catalog(kind: str, query: str, cv_text: str) -> Optional[List[Dict[str, Any]]]:
+    if not CATALOG_INDEX:
+        return None
+    return await run_blocking(catalog_index.lookup, kind, query, await cv_skills(cv_text))
+
+async def stale_catalog(kind: str, query: str, cv_text: str) -> Optional[List[Dict[str, Any]]]:
+    if not CATALOG_INDEX:
+        return None
+    return await run_blocking(catalog_index.lookup, kind, query, await cv_skills(cv_text), True)
+
+async def index_catalog(kind: str, query: str, items: List[Dict[str, Any]], complete: bool = True):
+    """Index a crawl. One that used fallbacks (missing descriptions, failed summaries)
+    only fills a gap, and is stored as stale so the next request scrapes again."""
+    if not complete and await run_blocking(catalog_index.lookup, kind, query, None, True) is not None:
+        return
+    model = CATALOG_SOURCES[kind][0]
+    await run_blocking(catalog_index.store, kind, query, [model(**item).model_dump() for item in items], complete)
+
+async def catalog_items(kind: str, query: str, cv_text: str) -> List[Dict[str, Any]]:
+    """Answer from the local index, scraping live (and indexing the result) on a miss"""
+    items = await lookup_catalog(kind, query, cv_text)
+    if CATALOG_INDEX:
+        metrics.inc("cache_requests_total", cache=f"catalog_{kind}", result="miss" if items is None else "hit")
+    if items is None:
+        try:
+            items, degraded = await track_degraded(CATALOG_SOURCES[kind][1], query)
+        except (HTTPException, UpstreamUnavailable):
+            # The source is down: serve what was last indexed, however old
+            items = await stale_catalog(kind, query, cv_text)
+            if items is None:
+                raise
+            mark_degraded(f"catalog_{kind}")
+            return items
+        if CATALOG_INDEX:
+            await index_catalog(kind, query, items, complete=not degraded)
+    return items
+
+async def ingest_catalog():
+    """Re-crawl every theme and the recently requested job titles and course topics, one at a time"""
+    seeds = {"job": seed_queries("CATALOG_JOB_TITLES"), "course": seed_queries("CATALOG_COURSE_TOPICS")}
+    for kind, kind_seeds in seeds.items():
+        await run_blocking(catalog_index.prune, kind, kind_seeds)
+    queries = {
+        "program": list(UM6PCareerAdvisor.THEME_URLS),
+        "job": seeds["job"] + await run_blocking(catalog_index.queries, "job", CATALOG_MAX_QUERIES),
+        "course": seeds["course"] + await run_blocking(catalog_index.queries, "course", CATALOG_MAX_QUERIES),
+    }
+    for kind, kind_queries in queries.items():
+        unique_queries = {}
+        for query in kind_queries:
+            unique_queries.setdefault(CatalogIndex.normalize_query(query), query)
+        for query in unique_queries.values():
+            try:
+                items, degraded = await track_degraded(CATALOG_SOURCES[kind][1], query)
+                await index_catalog(kind, query, items, complete=not degraded)
+            except Exception as e:
+                print(f"Error indexing {kind} {query!r}: {str(e)}")
+
+async def catalog_ingestion_loop():
+    while True:
+        started = time.monotonic()
+        await ingest_catalog()
+        print(f"Catalog index refreshed in {time.monotonic() - started:.1f}s")
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+
+async def jobs_pipeline(cv_text: str) -> JobRecommendationResponse:
+    recommended_job = await cached_cv_result("job_recommendation", cv_text, UM6PCareerAdvisor.get_job_recommendation)
+    jobs = await catalog_items("job", recommended_job, cv_text)
+    return JobRecommendationResponse(recommended_job=recommended_job, jobs=jobs)
+
+async def courses_pipeline(cv_text: str) -> CourseRecommendationResponse:
+    try:
+        suggested_topics = [await cached_cv_result("course_topic", cv_text, UM6PCareerAdvisor.get_course_topic)]
         
         all_courses = []
         for topic in suggested_topics:
-            courses =  UM6PCareerAdvisor.search_coursera_courses(topic.strip())
+            courses = await catalog_items("course", topic.strip(), cv_text)
             all_courses.extend(courses)
             
         return CourseRecommendationResponse(
@@ -573,16 +2916,44 @@ async def recommend_courses(file: UploadFile = File(...)):
             courses=all_courses
         )
         
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting course recommendations: {str(e)}")
 
-@app.post("/extract-profile", response_model=ProfileInfo)
-async def extract_profile(file: UploadFile = File(...)):
+async def extract_cv_profile(cv_text: str) -> Dict[str, Any]:
+    """The CV's profile from the local extractor, completed by the LLM where needed"""
+    if PROFILE_EXTRACTOR != "local":
+        return await UM6PCareerAdvisor.extract_profile_info(cv_text)
+    profile = await run_blocking(profile_extractor.extract, cv_text)
+    missing = [field for field in ("full_name", "location", "email", "phone") if not profile[field]]
+    if len(profile["key_skills"]) < PROFILE_MIN_SKILLS:
+        missing.append("key_skills")
+    metrics.inc("profile_extractions_total", source="llm_fallback" if missing else "local")
+    if not missing:
+        return profile
+
     try:
-        contents = await file.read()
-        cv_text = UM6PCareerAdvisor.extract_text_from_pdf(io.BytesIO(contents))
-        
-        profile_data = UM6PCareerAdvisor.extract_profile_info(cv_text)
+        answer = await UM6PCareerAdvisor.extract_profile_info(cv_text)
+    except (HTTPException, UpstreamUnavailable) as e:
+        if len(missing) == 5 and not profile["key_skills"]:
+            raise
+        # A partial profile beats an error
+        print(f"Error completing the profile with the LLM: {str(e)}")
+        mark_degraded("profile")
+        answer = UM6PCareerAdvisor.PROFILE_NOT_FOUND
+    for field in missing:
+        if field == "key_skills":
+            placeholders = UM6PCareerAdvisor.PROFILE_NOT_FOUND["key_skills"]
+            extra = [skill for skill in answer.get("key_skills") or [] if skill not in profile["key_skills"] + placeholders]
+            profile["key_skills"] = (profile["key_skills"] + extra)[:PROFILE_MAX_SKILLS] or list(UM6PCareerAdvisor.PROFILE_NOT_FOUND["key_skills"])
+        else:
+            profile[field] = answer.get(field) or UM6PCareerAdvisor.PROFILE_NOT_FOUND[field]
+    return profile
+
+async def profile_pipeline(cv_text: str) -> ProfileInfo:
+    try:
+        profile_data = await cached_cv_result("profile", cv_text, extract_cv_profile)
         
         return ProfileInfo(
             full_name=profile_data["full_name"],
@@ -591,11 +2962,527 @@ async def extract_profile(file: UploadFile = File(...)):
             phone=profile_data["phone"],
             key_skills=profile_data["key_skills"]
         )
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error in extract_profile endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Streaming variants: emit the recommendation first, then each item as soon as it is ready
+def sse_event(event: str, data, event_id=None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+async def education_events(cv_text: str):
+    recommended_theme, theme_scores = await recommend_theme(cv_text)
+    yield sse_event("recommendation", {
+        "recommended_theme": recommended_theme,
+        "theme_scores": [score.model_dump() for score in theme_scores],
+    })
+    for position, program in enumerate(await catalog_items("program", recommended_theme, cv_text)):
+        yield sse_event("program", Program(**program).model_dump(), position)
+
+async def catalog_events(event: str, kind: str, query: str, cv_text: str, live_items):
+    """Emit indexed items at once on a hit; otherwise stream `live_items` and index them.
+
+    As in catalog_items, a crawl that used fallbacks is only indexed as stale, and the
+    stale index is served when the source is down.
+    """
+    indexed = await lookup_catalog(kind, query, cv_text)
+    if indexed is not None:
+        for position, item in enumerate(indexed):
+            yield sse_event(event, item, position)
+        return
+    scraped, degraded = [], set()
+    try:
+        async for position, item in track_degraded_iter(live_items, degraded):
+            scraped.append((position, item))
+            yield sse_event(event, CATALOG_SOURCES[kind][0](**item).model_dump(), position)
+    except (HTTPException, UpstreamUnavailable):
+        # The source is down: serve what was last indexed, however old, unless live
+        # items have already been sent
+        items = None if scraped else await stale_catalog(kind, query, cv_text)
+        if items is None:
+            raise
+        mark_degraded(f"catalog_{kind}")
+        for position, item in enumerate(items):
+            yield sse_event(event, item, position)
+        return
+    if CATALOG_INDEX:
+        items = [item for _, item in sorted(scraped, key=lambda pair: pair[0])]
+        await index_catalog(kind, query, items, complete=not degraded)
+
+async def job_events(cv_text: str):
+    recommended_job = await cached_cv_result("job_recommendation", cv_text, UM6PCareerAdvisor.get_job_recommendation)
+    yield sse_event("recommendation", {"recommended_job": recommended_job})
+    async def live_items():
+        listings_html = await search_job_listings(recommended_job)
+        async for position, job_info in UM6PCareerAdvisor.iter_job_details(listings_html):
+            yield position, job_info
+    async for event in catalog_events("job", "job", recommended_job, cv_text, live_items()):
+        yield event
+
+async def course_events(cv_text: str):
+    topic = await cached_cv_result("course_topic", cv_text, UM6PCareerAdvisor.get_course_topic)
+    yield sse_event("recommendation", {"recommended_topics": [topic]})
+    live_items = UM6PCareerAdvisor.iter_coursera_courses(topic.strip())
+    async for event in catalog_events("course", "course", topic.strip(), cv_text, live_items):
+        yield event
+
+def sse_response(events) -> StreamingResponse:
+    """Stream `events` as text/event-stream, ending with a `done` or `error` event"""
+    async def stream():
+        try:
+            async for event in events:
+                yield event
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+            return
+        except UpstreamUnavailable as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": str(e)})
+            return
+        except Exception as e:
+            print(f"Error while streaming recommendations: {str(e)}")
+            yield sse_event("error", {"status_code": 500, "detail": str(e)})
+            return
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def analysis_pipeline(cv_text: str) -> AnalysisResponse:
+    """Run every recommendation pipeline concurrently on one CV"""
+    if os.getenv("LLM_COMBINED_CV_PROMPT", "0") == "1":
+        await prefetch_cv_answers(cv_text)
+
+    education, jobs, profile, coursera = await asyncio.gather(
+        education_pipeline(cv_text),
+        jobs_pipeline(cv_text),
+        profile_pipeline(cv_text),
+        courses_pipeline(cv_text),
+    )
+    return AnalysisResponse(education=education, jobs=jobs, profile=profile, coursera=coursera)
+
+# Batch intake: many CVs analysed by BATCH_CONCURRENCY workers that share the caches
+# and coalesced upstream calls, with one JSONL record per CV
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+
+def read_document(name: str, fileobj) -> Tuple[str, Optional[bytes]]:
+    """Read one PDF, or return None as its data if it exceeds PDF_MAX_UPLOAD_BYTES"""
+    data = fileobj.read(UM6PCareerAdvisor.PDF_MAX_UPLOAD_BYTES + 1)
+    return name, data if len(data) <= UM6PCareerAdvisor.PDF_MAX_UPLOAD_BYTES else None
+
+def iter_zip_documents(archive: zipfile.ZipFile):
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith(".pdf") or info.filename.startswith("__MACOSX/"):
+            continue
+        if info.file_size > UM6PCareerAdvisor.PDF_MAX_UPLOAD_BYTES:
+            yield info.filename, None
+            continue
+        with archive.open(info) as member:
+            yield read_document(info.filename, member)
+
+def iter_file_documents(files: List[Tuple[str, Any]]):
+    """Yield (name, pdf bytes) from open PDF and ZIP files, closing each once read"""
+    for name, fileobj in files:
+        with fileobj:
+            if zipfile.is_zipfile(fileobj):
+                with zipfile.ZipFile(fileobj) as archive:
+                    yield from iter_zip_documents(archive)
+            else:
+                fileobj.seek(0)
+                yield read_document(name, fileobj)
+
+def iter_path_documents(paths: List[str]):
+    """Yield (name, pdf bytes) from PDF files, ZIP archives and directories of PDFs"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.lower().endswith((".pdf", ".zip")):
+                        yield from iter_path_documents([os.path.join(root, name)])
+        else:
+            yield from iter_file_documents([(path, open(path, "rb"))])
+
+def next_document(documents):
+    return next(documents, None)
+
+async def analyze_batch_item(name: str, data: Optional[bytes], completed) -> Dict[str, Any]:
+    if data is None:
+        return {"id": None, "file": name, "status": "error", "error": "The uploaded file is too large"}
+    cv_id = hashlib.sha256(data).hexdigest()
+    if cv_id in completed:
+        return {"id": cv_id, "file": name, "status": "skipped"}
+    try:
+        cv_text = await cv_cache.memoize(f"pdf:{cv_id}", extract_pdf_text, data)
+        with deadline(REQUEST_DEADLINE):
+            analysis = await analysis_pipeline(cv_text)
+        return {"id": cv_id, "file": name, "status": "ok", "result": analysis.model_dump()}
+    except HTTPException as e:
+        return {"id": cv_id, "file": name, "status": "error", "error": e.detail}
+    except Exception as e:
+        print(f"Error analysing {name}: {str(e)}")
+        return {"id": cv_id, "file": name, "status": "error", "error": str(e)}
+
+async def analyze_batch(documents, completed=frozenset(), concurrency: int = BATCH_CONCURRENCY):
+    """Analyse (name, pdf bytes) pairs, yielding one record per CV in completion order.
+
+    Workers pull from `documents` lazily, so only `concurrency` CVs are in memory at
+    once. CVs whose id (the SHA-256 of the PDF) is in `completed` are skipped.
+    """
+    documents = iter(documents)
+    records = asyncio.Queue()
+    # Reading a file or inflating a ZIP member blocks, so documents are pulled in the
+    # blocking pool, one worker at a time (a generator can't be advanced concurrently)
+    reading = asyncio.Lock()
+
+    async def worker():
+        try:
+            while True:
+                async with reading:
+                    document = await run_blocking(next_document, documents)
+                if document is None:
+                    break
+                name, data = document
+                await records.put(await analyze_batch_item(name, data, completed))
+        finally:
+            await records.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    remaining = len(workers)
+    try:
+        while remaining:
+            record = await records.get()
+            if record is None:
+                remaining -= 1
+                continue
+            yield record
+    finally:
+        for task in workers:
+            task.cancel()
+
+def load_completed_ids(path: str) -> set:
+    """Ids of the CVs already analysed successfully in a JSONL results file"""
+    completed = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as results:
+            for line in results:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                if record.get("status") == "ok":
+                    completed.add(record["id"])
+    return completed
+
+async def run_batch_cli(paths: List[str], output: str, concurrency: int):
+    completed = load_completed_ids(output)
+    if completed:
+        print(f"Resuming: {len(completed)} CVs already analysed in {output}")
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    started = time.monotonic()
+    try:
+        with open(output, "ab+") as tail:
+            # Start on a fresh line if an interrupted run left a partial record
+            if tail.tell():
+                tail.seek(-1, os.SEEK_END)
+                if tail.read(1) != b"\n":
+                    tail.write(b"\n")
+        with open(output, "a", encoding="utf-8") as results:
+            async for record in analyze_batch(iter_path_documents(paths), completed, concurrency):
+                counts[record["status"]] += 1
+                if record["status"] == "skipped":
+                    continue
+                results.write(json.dumps(record) + "\n")
+                results.flush()
+                print(f"[{record['status']}] {record['file']}")
+    finally:
+        await close_clients()
+        pdf_service.shutdown()
+    print(f"Done in {time.monotonic() - started:.1f}s: {counts['ok']} analysed, {counts['error']} failed, {counts['skipped']} skipped")
+
+# Asynchronous mode: POST /tasks/{pipeline} queues the CV and returns a task id at once;
+# TASK_WORKERS workers run the pipeline and keep the result for TASK_RESULT_TTL seconds.
+# The queue is in-process unless TASK_QUEUE_URL points at Redis, which lets every
+# uvicorn worker (and host) share one queue and result store.
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", 4))
+TASK_RESULT_TTL = float(os.getenv("TASK_RESULT_TTL", 3600))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", 0.5))
+TASK_QUEUE_URL = os.getenv("TASK_QUEUE_URL")
+
+TASK_PIPELINES = {
+    "recommend-education": education_pipeline,
+    "recommend-jobs": jobs_pipeline,
+    "recommend-courses": courses_pipeline,
+    "extract-profile": profile_pipeline,
+    "analyze-cv": analysis_pipeline,
+}
+
+class InMemoryTaskQueue:
+    """Task queue and result store for a single process"""
+
+    def __init__(self, result_ttl: float):
+        self.result_ttl = result_ttl
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.records: Dict[str, Dict[str, Any]] = {}
+
+    async def put(self, record: Dict[str, Any], cv_text: str):
+        await self.save(record)
+        await self.queue.put((record["task_id"], cv_text))
+
+    async def take(self) -> Tuple[str, str]:
+        return await self.queue.get()
+
+    async def save(self, record: Dict[str, Any]):
+        self.records[record["task_id"]] = record
+        self._expire()
+
+    async def load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        self._expire()
+        return self.records.get(task_id)
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            task_id for task_id, record in self.records.items()
+            if record["finished_at"] and record["finished_at"] < cutoff
+        ]
+        for task_id in expired:
+            del self.records[task_id]
+
+    async def close(self):
+        pass
+
+class RedisTaskQueue:
+    """Task queue (a Redis list) and result store (expiring keys) shared across processes"""
+
+    def __init__(self, url: str, result_ttl: float):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.result_ttl = result_ttl
+
+    async def put(self, record: Dict[str, Any], cv_text: str):
+        await self.save(record)
+        await self.redis.lpush("tasks:queue", json.dumps({"task_id": record["task_id"], "cv_text": cv_text}))
+
+    async def take(self) -> Tuple[str, str]:
+        _, raw = await self.redis.brpop("tasks:queue")
+        item = json.loads(raw)
+        return item["task_id"], item["cv_text"]
+
+    async def save(self, record: Dict[str, Any]):
+        expiry = int(self.result_ttl) if record["finished_at"] else None
+        await self.redis.set(f"tasks:{record['task_id']}", json.dumps(record), ex=expiry)
+
+    async def load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(f"tasks:{task_id}")
+        return json.loads(raw) if raw else None
+
+    async def close(self):
+        await self.redis.aclose()
+
+task_queue = RedisTaskQueue(TASK_QUEUE_URL, TASK_RESULT_TTL) if TASK_QUEUE_URL else InMemoryTaskQueue(TASK_RESULT_TTL)
+task_workers: List[asyncio.Task] = []
+
+async def run_task(task_id: str, cv_text: str):
+    record = await task_queue.load(task_id)
+    if record is None:
+        return  # expired while queued
+    record.update(status="running", started_at=time.time())
+    await task_queue.save(record)
+    try:
+        with deadline(REQUEST_DEADLINE):
+            result = await TASK_PIPELINES[record["pipeline"]](cv_text)
+        record.update(status="done", result=result.model_dump())
+    except HTTPException as e:
+        record.update(status="failed", error=str(e.detail))
+    except Exception as e:
+        print(f"Error in task {task_id}: {str(e)}")
+        record.update(status="failed", error=str(e))
+    record["finished_at"] = time.time()
+    await task_queue.save(record)
+
+async def task_worker():
+    while True:
+        try:
+            task_id, cv_text = await task_queue.take()
+            await run_task(task_id, cv_text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Task worker error: {str(e)}")
+            await asyncio.sleep(1)
+
+def start_task_workers():
+    if not task_workers:
+        task_workers.extend(asyncio.create_task(task_worker()) for _ in range(TASK_WORKERS))
+
+async def task_events(task_id: str, record: Dict[str, Any]):
+    """Emit a `status` event whenever the task changes state, until it finishes"""
+    last_status = None
+    while True:
+        if record["status"] != last_status:
+            last_status = record["status"]
+            yield sse_event("status", TaskStatus(**record).model_dump())
+        if last_status in ("done", "failed"):
+            return
+        await asyncio.sleep(TASK_POLL_INTERVAL)
+        record = await task_queue.load(task_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Task not found or expired")
+
+catalog_ingestion_task: Optional[asyncio.Task] = None
+
+# API Endpoints
+@app.on_event("startup")
+async def startup():
+    if os.getenv("PROGRAM_CACHE_WARMUP", "0") == "1":
+        # Don't hold up startup; the first requests share the in-flight loads
+        asyncio.create_task(warm_program_cache())
+    pdf_service.start()
+    if CATALOG_INDEX:
+        global catalog_ingestion_task
+        catalog_ingestion_task = asyncio.create_task(catalog_ingestion_loop())
+    start_task_workers()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if catalog_ingestion_task is not None:
+        catalog_ingestion_task.cancel()
+    for worker in task_workers:
+        worker.cancel()
+    await task_queue.close()
+    await close_clients()
+    pdf_service.shutdown()
+
+@app.post("/recommend-education", response_model=RecommendationResponse)
+async def recommend_education(file: UploadFile = File(...)):
+    cv_text = await read_cv_text(file)
+    return await education_pipeline(cv_text)
+
+@app.post("/recommend-jobs", response_model=JobRecommendationResponse)
+async def recommend_jobs(file: UploadFile = File(...)):
+    cv_text = await read_cv_text(file)
+    return await jobs_pipeline(cv_text)
+
+@app.post("/recommend-courses", response_model=CourseRecommendationResponse)
+async def recommend_courses(file: UploadFile = File(...)):
+    cv_text = await read_cv_text(file)
+    return await courses_pipeline(cv_text)
+
+@app.post("/extract-profile", response_model=ProfileInfo)
+async def extract_profile(file: UploadFile = File(...)):
+    try:
+        cv_text = await read_cv_text(file)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in extract_profile endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    return await profile_pipeline(cv_text)
+
+@app.post("/recommend-education/stream")
+async def recommend_education_stream(file: UploadFile = File(...)):
+    cv_text = await read_cv_text(file)
+    return sse_response(education_events(cv_text))
+
+@app.post("/recommend-jobs/stream")
+async def recommend_jobs_stream(file: UploadFile = File(...)):
+    cv_text = await read_cv_text(file)
+    return sse_response(job_events(cv_text))
+
+@app.post("/recommend-courses/stream")
+async def recommend_courses_stream(file: UploadFile = File(...)):
+    cv_text = await read_cv_text(file)
+    return sse_response(course_events(cv_text))
+
+@app.post("/analyze-cv", response_model=AnalysisResponse)
+async def analyze_cv(file: UploadFile = File(...)):
+    """Parse the CV once and run every recommendation pipeline concurrently"""
+    cv_text = await read_cv_text(file)
+    return await analysis_pipeline(cv_text)
+
+@app.post("/batch/analyze")
+async def batch_analyze(files: List[UploadFile] = File(...), completed_ids: List[str] = Form([])):
+    """Analyse every PDF in the uploaded files and ZIP archives, streaming JSONL records"""
+    # The uploads are closed as soon as this handler returns, so copy them first
+    copies = []
+    for file in files:
+        copy = tempfile.TemporaryFile()
+        await run_blocking(shutil.copyfileobj, file.file, copy)
+        copies.append((file.filename, copy))
+
+    async def records():
+        try:
+            async for record in analyze_batch(iter_file_documents(copies), set(completed_ids)):
+                yield json.dumps(record) + "\n"
+        finally:
+            for _, copy in copies:
+                copy.close()
+
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+@app.post("/tasks/{pipeline}", response_model=TaskStatus, status_code=202)
+async def submit_task(pipeline: str, file: UploadFile = File(...)):
+    """Queue a recommendation pipeline and return its task id without waiting for it"""
+    if pipeline not in TASK_PIPELINES:
+        raise HTTPException(status_code=404, detail=f"Unknown pipeline: {pipeline}")
+    cv_text = await read_cv_text(file)
+    start_task_workers()
+    record = TaskStatus(task_id=uuid.uuid4().hex, pipeline=pipeline, status="queued", created_at=time.time()).model_dump()
+    await task_queue.put(record, cv_text)
+    return record
+
+@app.get("/tasks/{task_id}", response_model=TaskStatus)
+async def get_task(task_id: str):
+    record = await task_queue.load(task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Task not found or expired")
+    return record
+
+@app.get("/tasks/{task_id}/events")
+async def task_status_stream(task_id: str):
+    record = await task_queue.load(task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Task not found or expired")
+    return sse_response(task_events(task_id, record))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (per process: each uvicorn worker reports its own)"""
+    for name, value in pdf_service.stats().items():
+        if name != "workers":
+            metrics.set_gauge(f"pdf_extraction_{name}", value)
+    for flight_name, flight in (("http", http_flight), ("llm", llm_flight), ("job_summary", summary_flight)):
+        metrics.set_gauge("single_flight_calls", flight.calls, flight=flight_name)
+        metrics.set_gauge("single_flight_shared", flight.shared, flight=flight_name)
+    for name, breaker in circuit_breakers.items():
+        for state in ("closed", "open", "half_open"):
+            metrics.set_gauge("circuit_breaker_state", int(breaker.state == state), upstream=name, state=state)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats/pdf-extraction")
+async def pdf_extraction_stats():
+    return pdf_service.stats()
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    import sys
+    if sys.argv[1:2] == ["batch"]:
+        import argparse
+        parser = argparse.ArgumentParser(prog="backend.py batch", description="Analyse a cohort of CVs into a JSONL file")
+        parser.add_argument("inputs", nargs="+", help="PDF files, ZIP archives of PDFs, or directories")
+        parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL results file; re-running resumes it")
+        parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY, help="CVs analysed at once")
+        args = parser.parse_args(sys.argv[2:])
+        asyncio.run(run_batch_cli(args.inputs, args.output, args.concurrency))
+    else:
+        import uvicorn
+        uvicorn.run(app, host="127.0.0.1", port=8000)
 
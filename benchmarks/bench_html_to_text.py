@@ -0,0 +1,55 @@
+"""Benchmark the job-posting HTML-to-text reduction.
+
+Compares the raw `t-break` HTML that used to be sent to the LLM with the output of
+`html_to_text`, and times the reduction on a saved Bayt job page.
+
+    python benchmarks/bench_html_to_text.py [--iterations 500] [--max-tokens 600]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from backend import html_to_text, estimate_tokens
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bayt_job_detail.html")
+# Block boundaries the reduction must keep: (HTML, expected text)
+CASES = [
+    ("<div>Intro<p>Para</p></div>", "Intro\nPara"),
+    ("<div><strong>Requirements:</strong><ul><li>Python</li><li>SQL</li></ul>Apply by mail</div>",
+     "Requirements:\n- Python\n- SQL\nApply by mail"),
+    ("<p>Located in <b>Casablanca</b>, Morocco</p><p>Full time</p>", "Located in Casablanca, Morocco\nFull time"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--max-tokens", type=int, default=600)
+    args = parser.parse_args()
+
+    for html, expected in CASES:
+        assert html_to_text(html) == expected, f"{html!r} -> {html_to_text(html)!r}"
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        page = f.read()
+    job_html = str(BeautifulSoup(page, "html.parser").find("div", class_="t-break"))
+    text = html_to_text(job_html, args.max_tokens)
+    assert "What we offer:\n- Competitive salary" in text, "inline label merged into the list that follows it"
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        html_to_text(job_html, args.max_tokens)
+    elapsed = time.perf_counter() - start
+
+    print(f"raw HTML:     {len(job_html):>7} chars  ~{estimate_tokens(job_html):>5} tokens")
+    print(f"reduced text: {len(text):>7} chars  ~{estimate_tokens(text):>5} tokens "
+          f"({1 - len(text) / len(job_html):.0%} smaller)")
+    print(f"html_to_text: {elapsed / args.iterations * 1e6:.1f} us/call over {args.iterations} iterations")
+
+
+if __name__ == "__main__":
+    main()
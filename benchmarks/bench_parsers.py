@@ -0,0 +1,52 @@
+"""Micro-benchmark the scraper parsers on saved fixture pages.
+
+For each site, times the parser used by the backend (lxml, restricted with a
+SoupStrainer to the containers it reads) against a full `html.parser` parse of the
+same page, which is what every scraper used to do before extracting anything.
+
+    python benchmarks/bench_parsers.py [--iterations 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from backend import UM6PCareerAdvisor
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CASES = [
+    ("bayt search", "bayt_search.html", UM6PCareerAdvisor.parse_job_listings),
+    ("bayt job detail", "bayt_job_detail.html", UM6PCareerAdvisor.parse_job_detail),
+    ("um6p program finder", "um6p_program_finder.html", UM6PCareerAdvisor.parse_programs),
+    ("coursera search", "coursera_search.html", UM6PCareerAdvisor.parse_course_cards),
+    ("coursera course", "coursera_course.html", UM6PCareerAdvisor.parse_course_details),
+]
+
+
+def time_per_call(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'page':<22}{'size':>9}{'full html.parser':>19}{'backend parser':>17}{'speedup':>10}")
+    for name, filename, parse in CASES:
+        with open(os.path.join(FIXTURES, filename), encoding="utf-8") as f:
+            page = f.read()
+        baseline = time_per_call(lambda html: BeautifulSoup(html, "html.parser"), page, args.iterations)
+        current = time_per_call(parse, page, args.iterations)
+        print(f"{name:<22}{len(page) / 1024:>7.1f}KB{baseline:>16.2f} ms{current:>14.2f} ms{baseline / current:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Offline load test of the CV endpoints against stubbed upstreams.
+
+Runs each endpoint in-process via ASGI, with sequential and concurrent scenarios.
+The scraped sites are served from the fixture pages, Groq is replaced by a fake
+completions API with configurable latency (see `stubs.py`), and each request
+uploads a different generated CV. No network is used.
+
+For every scenario it reports:
+- throughput;
+- p50/p95/p99 latency;
+- CPU time of the server process and of its PDF worker processes;
+- wall time spent in each instrumented stage (`blocking:*` stages run in the
+  thread pool, `llm:*` and `fetch:*` are waits on the stubs).
+
+`--save` writes the results as JSON. `--compare` checks a run against a saved
+baseline and exits 1 when p95 latency or throughput regresses by more than
+`--tolerance`.
+
+    python benchmarks/load_test.py [--requests 40] [--concurrency 1 8 32]
+        [--llm-latency-ms 300] [--upstream-latency-ms 80] [--save results.json]
+        [--compare baseline.json --tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = ["/recommend-education", "/recommend-jobs", "/recommend-courses", "/extract-profile"]
+
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def stage_totals(metrics):
+    """{stage: (calls, wall seconds)} from the backend's stage histogram"""
+    series = metrics.histograms.get("stage_duration_seconds", {})
+    return {dict(key)["stage"]: (values[-1], values[-2]) for key, values in series.items()}
+
+
+async def run_scenario(backend, client, endpoint, cvs, concurrency):
+    backend.metrics = backend.Metrics()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(cv):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(endpoint, files={"file": ("cv.pdf", cv, "application/pdf")})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    cpu_started, children_started = time.process_time(), children_cpu()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(cv) for cv in cvs))
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    # PDF workers' CPU time only shows in RUSAGE_CHILDREN once they have exited, so
+    # retire the pool (start() builds a fresh one for the next scenario)
+    backend.pdf_service.shutdown(wait=True)
+    worker_cpu = children_cpu() - children_started
+    backend.pdf_service.start()
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(cvs),
+        "errors": errors,
+        "throughput": len(cvs) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "cpu_seconds": cpu + worker_cpu,
+        "pdf_worker_cpu_seconds": worker_cpu,
+        "stages": {stage: {"calls": calls, "wall_seconds": seconds} for stage, (calls, seconds) in stage_totals(backend.metrics).items()},
+    }
+
+
+def print_scenario(result, show_stages):
+    print(f"{result['endpoint']}  concurrency={result['concurrency']}  requests={result['requests']}  errors={result['errors']}")
+    print(
+        f"  {result['throughput']:.1f} req/s   p50 {result['p50_ms']:.0f} ms   p95 {result['p95_ms']:.0f} ms   "
+        f"p99 {result['p99_ms']:.0f} ms   CPU {result['cpu_seconds']:.2f} s ({result['cpu_seconds'] / result['requests'] * 1000:.1f} ms/request, "
+        f"{result['pdf_worker_cpu_seconds']:.2f} s in PDF workers)"
+    )
+    if show_stages:
+        print(f"    {'stage (wall time)':<52}{'calls':>7}{'total':>15}{'mean':>18}")
+        stages = sorted(result["stages"].items(), key=lambda item: -item[1]["wall_seconds"])
+        for stage, totals in stages:
+            mean = totals["wall_seconds"] / totals["calls"] * 1000
+            print(f"    {stage:<52}{totals['calls']:>7}{totals['wall_seconds'] * 1000:>12.1f} ms{mean:>10.2f} ms/call")
+
+
+def compare(results, baseline_path, tolerance):
+    """Print the regressions against a saved run and return how many there were"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["endpoint"], r["concurrency"]): r for r in json.load(f)["scenarios"]}
+    regressions = 0
+    for result in results:
+        before = baseline.get((result["endpoint"], result["concurrency"]))
+        if before is None:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            print(f"REGRESSION {result['endpoint']} c={result['concurrency']}: p95 {before['p95_ms']:.0f} -> {result['p95_ms']:.0f} ms")
+            regressions += 1
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            print(f"REGRESSION {result['endpoint']} c={result['concurrency']}: {before['throughput']:.1f} -> {result['throughput']:.1f} req/s")
+            regressions += 1
+    return regressions
+
+
+async def run(args):
+    import httpx
+    import backend
+    import stubs
+
+    stubs.install(backend, args.upstream_latency_ms / 1000, args.llm_latency_ms / 1000, args.llm_jitter_ms / 1000)
+    scenarios = [(endpoint, concurrency) for endpoint in args.endpoints for concurrency in args.concurrency]
+    if args.cv_dir:
+        corpus = stubs.load_cvs(args.cv_dir)
+        cvs = [corpus[i % len(corpus)] for i in range(args.requests * len(scenarios))]
+    else:
+        # Distinct CVs for every request, so CV-level caches never answer for another scenario
+        cvs = stubs.sample_cvs(args.requests * len(scenarios) + len(args.endpoints))
+
+    results = []
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm-up: start the PDF pool and fill the per-theme/posting caches once per endpoint
+        for endpoint in args.endpoints:
+            await client.post(endpoint, files={"file": ("cv.pdf", cvs.pop(), "application/pdf")})
+        for i, (endpoint, concurrency) in enumerate(scenarios):
+            batch = cvs[i * args.requests:(i + 1) * args.requests]
+            result = await run_scenario(backend, client, endpoint, batch, concurrency)
+            print_scenario(result, not args.no_stages)
+            results.append(result)
+    await backend.close_clients()
+    backend.pdf_service.shutdown(wait=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50)
+    parser.add_argument("--upstream-latency-ms", type=float, default=80)
+    parser.add_argument("--pdf-workers", type=int, default=2, help="PDF_POOL_SIZE (0 = thread pool)")
+    parser.add_argument("--no-rate-limit", action="store_true", help="lift the Coursera rate limit")
+    parser.add_argument("--cv-dir", help="benchmark with the PDFs in this directory instead of generated CVs")
+    parser.add_argument("--no-stages", action="store_true", help="hide the per-stage breakdown")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    # The backend reads its configuration at import time; start from empty caches
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="career-bench-")
+    os.environ["PDF_POOL_SIZE"] = str(args.pdf_workers)
+    # Forked workers inherit the stubbed API keys
+    os.environ["PDF_POOL_START_METHOD"] = "fork"
+    if args.no_rate_limit:
+        os.environ["COURSERA_RATE"] = os.environ["COURSERA_BURST"] = "1000"
+
+    results = asyncio.run(run(args))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "scenarios": results}, f, indent=2)
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
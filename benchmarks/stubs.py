@@ -0,0 +1,187 @@
+"""Offline stand-ins for the backend's upstreams, shared by the load-test benchmark.
+
+- Scraped sites (exed.um6p.ma, bayt.com, coursera.org) are served from the saved
+  pages in `fixtures/` through an httpx mock transport.
+- Groq is a fake OpenAI-style chat-completions endpoint, driven through the real
+  AsyncGroq client, that recognises each backend prompt and answers in the
+  expected format.
+- Sample CVs are small generated PDFs with varied profiles.
+
+Both stand-ins sleep for a configurable latency so the timings look like the real
+services without any network access.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import zlib
+from collections import defaultdict
+
+import httpx
+from groq import AsyncGroq
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(filename):
+    with open(os.path.join(FIXTURES, filename), encoding="utf-8") as f:
+        return f.read()
+
+
+def fixture_for(url):
+    """Saved page standing in for `url`, or None for an unknown page (served as a 404)"""
+    host, path = url.host, url.path
+    if host == "exed.um6p.ma":
+        return "um6p_program_finder.html"
+    if host == "www.bayt.com":
+        return "bayt_search.html" if path.endswith("-jobs/") else "bayt_job_detail.html"
+    if host == "www.coursera.org":
+        return "coursera_search.html" if path.startswith("/search") else "coursera_course.html"
+    return None
+
+
+def upstream_transport(latency):
+    """httpx transport answering scraper requests from fixtures after `latency` seconds"""
+    pages = {}
+
+    async def handler(request):
+        await asyncio.sleep(latency)
+        filename = fixture_for(request.url)
+        if filename is None:
+            return httpx.Response(404, text="")
+        if filename not in pages:
+            pages[filename] = load_fixture(filename)
+        return httpx.Response(200, text=pages[filename], headers={"content-type": "text/html; charset=utf-8"})
+
+    return httpx.MockTransport(handler)
+
+
+THEMES = ["Industrie 4.0", "Digital: AI, Data Science, Cybersecurity & Cloud Computing", "Sustainability", "Process Engineering"]
+JOB_TITLES = ["Data Engineer", "Data Scientist", "Process Engineer", "Maintenance Engineer", "Sustainability Analyst"]
+TOPICS = ["data engineering", "machine learning", "industrial automation", "project management"]
+
+
+def fake_reply(messages):
+    """Answer a backend prompt the way the model would, in the format it asks for"""
+    system = messages[0]["content"] if messages[0]["role"] == "system" else ""
+    prompt = messages[-1]["content"]
+    # Pick stable answers per CV so repeated CVs hit the same downstream pages
+    choice = lambda options: options[zlib.crc32(prompt.encode("utf-8")) % len(options)]
+    postings = [int(i) for i in re.findall(r"Posting (\d+):", prompt)]
+    if postings:
+        return json.dumps({"summaries": [{"id": i, "summary": f"Summary of posting {i}: builds data pipelines."} for i in postings]})
+    profile = {
+        "full_name": "Sample Candidate",
+        "location": "Casablanca, Morocco",
+        "email": "candidate@example.com",
+        "phone": "+212600000000",
+        "key_skills": ["Python", "SQL", "Docker", "Spark"],
+    }
+    if '"job_title"' in prompt:
+        return json.dumps({"theme": choice(THEMES), "job_title": choice(JOB_TITLES), "course_topic": choice(TOPICS), "profile": profile})
+    if "CV parser" in system:
+        return json.dumps(profile)
+    if "Available themes" in prompt:
+        return choice(THEMES)
+    if "job title" in prompt:
+        return choice(JOB_TITLES)
+    if "topic" in prompt:
+        return choice(TOPICS)
+    return "Summary:\nBuilds and maintains data pipelines for an industrial group in Morocco."
+
+
+def groq_transport(latency, jitter=0.0):
+    """httpx transport acting as the Groq chat-completions API"""
+
+    async def handler(request):
+        body = json.loads(request.content)
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+        content = fake_reply(body["messages"])
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4, "total_tokens": prompt_tokens + len(content) // 4},
+        })
+
+    return httpx.MockTransport(handler)
+
+
+def install(backend, upstream_latency, llm_latency, llm_jitter=0.0):
+    """Point the backend's shared HTTP and Groq clients at the stand-ins"""
+    backend.UM6PCareerAdvisor.api_keys = defaultdict(lambda: "bench-key")
+    backend._http_client = httpx.AsyncClient(transport=upstream_transport(upstream_latency), follow_redirects=True)
+    backend._llm_clients["bench-key"] = AsyncGroq(
+        api_key="bench-key",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=groq_transport(llm_latency, llm_jitter), base_url="https://api.groq.com"),
+    )
+
+
+SKILLS = [
+    "Python", "SQL", "Machine Learning", "Docker", "Spark", "AutoCAD", "Aspen Plus", "PLC programming",
+    "Lean Six Sigma", "Power BI", "Hydrology", "GIS", "Project management", "Kubernetes", "Process simulation",
+]
+ROLES = ["Data Engineer", "Process Engineer", "Maintenance Technician", "Data Analyst", "HSE Officer", "Water Engineer"]
+CITIES = ["Casablanca", "Rabat", "Benguerir", "Marrakech", "Tanger", "Agadir"]
+FIRST_NAMES = ["Salma", "Youssef", "Imane", "Mehdi", "Khadija", "Omar", "Sara", "Anas"]
+LAST_NAMES = ["Bennani", "El Amrani", "Alaoui", "Tazi", "Berrada", "Idrissi", "Chraibi", "Fassi"]
+
+
+def make_pdf(lines):
+    """Minimal single-page PDF with one line of text per entry"""
+    escape = lambda text: text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    content = "BT /F1 11 Tf 50 760 Td 14 TL " + " ".join(f"({escape(line)}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+def sample_cvs(count, seed=0):
+    """`count` distinct CV PDFs with varied roles, skills and experience"""
+    rng = random.Random(seed)
+    cvs = []
+    for i in range(count):
+        role = rng.choice(ROLES)
+        skills = rng.sample(SKILLS, 5)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        lines = [
+            f"{first} {last}",
+            f"{rng.choice(CITIES)}, Morocco",
+            f"{first.lower()}.{last.lower().replace(' ', '')}{i}@example.com  +212 6{rng.randint(10000000, 99999999)}",
+            "Experience",
+        ]
+        for year in range(rng.randint(1, 4)):
+            lines.append(f"{role} at Company {rng.randint(1, 50)} ({2015 + 2 * year}-{2017 + 2 * year})")
+            lines.append(f"Delivered projects using {rng.choice(skills)} and {rng.choice(skills)}")
+        lines += ["Skills", ", ".join(skills), "Education", f"MSc {rng.choice(['Data Science', 'Chemical Engineering', 'Water Sciences', 'Industrial Engineering'])}"]
+        cvs.append(make_pdf(lines))
+    return cvs
+
+
+def load_cvs(directory):
+    """Every PDF in `directory`, for benchmarking against real (anonymised) CVs"""
+    cvs = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(".pdf"):
+            with open(os.path.join(directory, name), "rb") as f:
+                cvs.append(f.read())
+    return cvs